@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rebuild catalog of construction parameters (see catalog.py) of all orders up to a bound,
+fields of the orders are computed by worker processes.
+
+    python3 build_catalog.py --bound 100000 --processes 8
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import DEFAULT_PATH, write_catalog
+from field import FieldContext
+from kts import KTS
+
+DEFAULT_BOUND = 100000
+
+
+def parameters(constructions):
+    """
+    Worker computing parameters of given constructions.
+    :param constructions: list of (order, method name, q)
+    :return: list of (order, method name, q, generator, alpha, m)
+    """
+    records = []
+    for order, method_name, q in constructions:
+        field = FieldContext(q)
+        generator = field.alpha if field.k == 1 else field.polynomial
+        alpha = KTS.default_alpha_of(method_name, q)
+        if alpha is not None:
+            field = FieldContext(q, alpha, generator)
+        records.append((order, method_name, q, generator, alpha, field.m))
+    return records
+
+
+def build(bound, processes=None):
+    """
+    :param bound: the greatest order
+    :param processes: number of worker processes, None for number of CPUs
+    :return: list of records sorted by order, see catalog.write_catalog
+    """
+    constructions = [(order, method_name, q) for order, method_name, q in KTS.feasible_orders(bound) if method_name]
+    processes = processes or os.cpu_count()
+    # interleaved chunks, so that each has small and large fields
+    tasks = processes * 4
+    with ProcessPoolExecutor(processes) as executor:
+        chunks = executor.map(parameters, [constructions[i::tasks] for i in range(tasks)])
+        return sorted(record for chunk in chunks for record in chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild catalog of construction parameters.')
+    parser.add_argument('--bound', type=int, default=DEFAULT_BOUND, metavar='N',
+                        help='the greatest order of catalog (default %s)' % DEFAULT_BOUND)
+    parser.add_argument('--processes', type=int, metavar='N', help='number of worker processes (default number of CPUs)')
+    parser.add_argument('--output', default=DEFAULT_PATH, metavar='FILE', help='catalog file (default %s)' % DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    records = build(args.bound, args.processes)
+    temporary = args.output + '.tmp'
+    with open(temporary, 'wb') as stream:
+        write_catalog(stream, args.bound, records)
+    os.replace(temporary, args.output)
+    print('%s orders up to %s written to %s' % (len(records), args.bound, args.output), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
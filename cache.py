@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Persistent cache of KTS solutions in versioned binary files, loaded by memory mapping.
+
+File layout (native byte order, flagged in header):
+    magic 'KTSC', version (uint16), header size (uint16), byte order ('<' or '>'), padding (3 bytes),
+    order, q, number of days, CRC-32 of triples (uint32 each), method name (utf-8, zero padded
+    to multiple of 4 bytes), then triples as packed uint32 array of shape (days, order / 3, 3).
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+from solution import KTSSolution
+
+MAGIC = b'KTSC'
+VERSION = 2
+HEADER = struct.Struct('=4sHHc3xIIII')
+BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'kts')
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+class SolutionCache:
+    """
+    Directory of cached solutions, bounded in size by evicting the least recently used files.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        :param directory: cache directory, defaults to $KTS_CACHE_DIR or ~/.cache/kts
+        :param max_bytes: upper bound of total size of cached files
+        """
+        self.directory = directory or os.environ.get('KTS_CACHE_DIR') or DEFAULT_DIRECTORY
+        self.max_bytes = max_bytes
+
+    def path(self, kts):
+        if kts.alpha is not None:
+            return os.path.join(self.directory, 'kts_%s_alpha%s.bin' % (kts.order, kts.alpha))
+        return os.path.join(self.directory, 'kts_%s.bin' % kts.order)
+
+    def load(self, kts):
+        """
+        Memory map cached solution of KTS, triples are not copied.
+        Invalid files (other version, byte order, KTS or broken checksum) are removed.
+        :param kts: KTS instance
+        :return: KTSSolution or None when not cached
+        """
+        path = self.path(kts)
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        solution = self.parse(mapped, kts)
+        if solution is None:
+            mapped.close()
+            self.remove(path)
+            return None
+
+        # most recently used
+        os.utime(path)
+        return solution
+
+    @staticmethod
+    def parse(mapped, kts):
+        """
+        :return: KTSSolution backed by mapped file, None if file does not match KTS
+        """
+        if len(mapped) < HEADER.size:
+            return None
+        magic, version, header_size, byte_order, order, q, num_days, checksum = HEADER.unpack_from(mapped)
+        if (magic, version, byte_order) != (MAGIC, VERSION, BYTE_ORDER) or (order, q) != (kts.order, kts.q):
+            return None
+        method_name = bytes(mapped[HEADER.size:header_size]).rstrip(b'\0').decode('utf-8', 'replace')
+        if method_name != kts.method_name or len(mapped) != header_size + num_days * order * 4:
+            return None
+
+        triples = memoryview(mapped)[header_size:]
+        if zlib.crc32(triples) != checksum:
+            triples.release()
+            return None
+        return KTSSolution(order, triples.cast('I'))
+
+    def store(self, kts, solution):
+        """
+        Write solution atomically (to temporary file renamed over the cached one), then evict
+        least recently used files beyond max_bytes.
+        :param kts: KTS instance
+        :param solution: KTSSolution
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        triples = solution.points.cast('B')
+        method_name = kts.method_name.encode('utf-8')
+        method_name += b'\0' * (-len(method_name) % 4)
+        header = HEADER.pack(MAGIC, VERSION, HEADER.size + len(method_name), BYTE_ORDER,
+                             kts.order, kts.q, solution.num_days, zlib.crc32(triples))
+
+        f = tempfile.NamedTemporaryFile(dir=self.directory, prefix='.kts_', suffix='.tmp', delete=False)
+        try:
+            with f:
+                f.write(header)
+                f.write(method_name)
+                f.write(triples)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f.name, self.path(kts))
+        except BaseException:
+            self.remove(f.name)
+            raise
+
+        self.evict(keep=self.path(kts))
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used files until the cache fits into max_bytes.
+        :param keep: path not to be removed (e.g. just stored file)
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('kts_') and entry.name.endswith('.bin'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                self.remove(path)
+                total -= size
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Catalog of precomputed construction parameters of all orders up to a bound, shipped as versioned
+binary file kts_catalog.bin (rebuilt by build_catalog.py). KTS looks the order up instead of factoring q
+and searching for primitive root, the file is memory mapped on first lookup and searched by bisection.
+
+File layout (little endian):
+    magic 'KTSP', version (uint16), record size (uint16), number of records, bound (uint32 each),
+    then records sorted by order: order, q, generator, alpha, m (uint32 each), method (uint8), padding (3 bytes).
+Generator is the least primitive root modulo q (prime q) or primitive polynomial (prime power q),
+see field.FieldContext, alpha is the default primitive element (KTS.default_alpha_of, 0 for the least one)
+and m belongs to it. Orders up to the bound which have no record are not constructible.
+"""
+
+import mmap
+import os
+import struct
+from functools import lru_cache
+
+MAGIC = b'KTSP'
+VERSION = 2
+HEADER = struct.Struct('<4sHHII')
+RECORD = struct.Struct('<IIIIIB3x')
+
+METHODS = {1: 'Construction 1.1', 2: 'Construction 1.2'}
+METHOD_CODES = {name: code for code, name in METHODS.items()}
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kts_catalog.bin')
+
+
+class Catalog:
+    """
+    Memory mapped catalog file.
+    """
+
+    def __init__(self, mapped):
+        """
+        Raise ValueError if mapped file is not catalog of this version.
+        :param mapped: mmap of catalog file
+        """
+        if len(mapped) < HEADER.size:
+            raise ValueError('Catalog is too short')
+        magic, version, record_size, self.count, self.bound = HEADER.unpack_from(mapped)
+        if (magic, version, record_size) != (MAGIC, VERSION, RECORD.size) or \
+                len(mapped) != HEADER.size + self.count * RECORD.size:
+            raise ValueError('Catalog is not valid catalog of version %s' % VERSION)
+        self.mapped = mapped
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def record(self, i):
+        """
+        :return: tuple (order, q, generator, alpha, m, method code) of i-th record
+        """
+        return RECORD.unpack_from(self.mapped, HEADER.size + i * RECORD.size)
+
+    def lookup(self, order):
+        """
+        Raise KeyError if order is beyond the bound.
+        :param order: order of KTS
+        :return: tuple (method name, q, generator, alpha, m), alpha is None for the least primitive element,
+            None if no construction applies
+        """
+        if order > self.bound:
+            raise KeyError(order)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from('<I', self.mapped, HEADER.size + middle * RECORD.size)[0] < order:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        found, q, generator, alpha, m, method = self.record(low)
+        return (METHODS[method], q, generator, alpha or None, m) if found == order else None
+
+
+def write_catalog(stream, bound, records):
+    """
+    :param stream: binary stream
+    :param bound: the greatest order covered by catalog
+    :param records: tuples (order, method name, q, generator, alpha, m) sorted by order, alpha None
+        for the least primitive element
+    """
+    records = list(records)
+    stream.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(records), bound))
+    stream.write(b''.join(RECORD.pack(order, q, generator, alpha or 0, m, METHOD_CODES[method_name])
+                          for order, method_name, q, generator, alpha, m in records))
+
+
+@lru_cache(maxsize=1)
+def get_catalog():
+    """
+    Catalog shipped with the package, opened on first use.
+    :return: Catalog, None if it is missing or not valid
+    """
+    try:
+        return Catalog.open()
+    except (OSError, ValueError):
+        return None
+
+
+def lookup(order):
+    """
+    Raise KeyError if order is not covered by catalog (or there is no valid catalog).
+    :return: tuple (method name, q, generator, alpha, m), None if no construction applies, see Catalog.lookup
+    """
+    catalog = get_catalog()
+    if catalog is None:
+        raise KeyError(order)
+    return catalog.lookup(order)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized engine developing base blocks of KTS through Galois Field by NumPy.
+"""
+
+import numpy as np
+
+# number of points developed at once, bounds memory of temporary arrays
+CHUNK_POINTS = 1 << 22
+
+
+def develop(blocks, offsets, field, fixed, out):
+    """
+    Develop blocks through all offsets by single broadcasted field addition.
+    :param blocks: array of point codes 'group * q + element' of base blocks
+    :param offsets: array of field elements broadcastable against blocks
+    :param field: FieldContext
+    :param fixed: point codes from this value up are not developed (i.e. point infinity)
+    :param out: int32 array receiving points (counted from 1) of developed blocks
+    """
+    elements = blocks % field.q
+    field.add_array(elements, offsets, out=out)
+    out += (blocks - elements + 1).astype(out.dtype)
+    np.copyto(out, blocks + 1, where=blocks >= fixed)
+
+
+def develop_classes(kts):
+    """
+    Obtain all parallel classes of KTS at once.
+    :param kts: KTS instance
+    :return: int32 array of shape (days, order / 3, 3)
+    """
+    solution = np.empty((kts.num_days, kts.order // 3, 3), dtype=np.int32)
+    develop_days(kts, 0, kts.num_days, solution)
+    return solution
+
+
+def develop_days(kts, first, last, out):
+    """
+    Obtain parallel classes of given range of days.
+    :param kts: KTS instance
+    :param first: the first day counted from zero
+    :param last: the day after the last one
+    :param out: int32 array of shape (last - first, order / 3, 3) receiving the days
+    """
+    class_blocks, remainder_blocks = kts.get_base_blocks()
+    class_blocks = np.array(class_blocks, dtype=np.int32).reshape(-1, 3)
+    remainder_blocks = np.array(remainder_blocks, dtype=np.int32).reshape(-1, 3)
+    fixed = kts.groups * kts.q
+    offsets = np.arange(kts.q, dtype=np.int32)
+    step = max(1, CHUNK_POINTS // kts.order)
+
+    # parallel class per each offset
+    for start in range(first, min(last, kts.q), step):
+        stop = min(start + step, last, kts.q)
+        develop(class_blocks[np.newaxis], offsets[start:stop, np.newaxis, np.newaxis], kts.field, fixed,
+                out[start - first:stop - first])
+
+    # remainder classes (Construction 1.2), each made from one block developed through all offsets
+    for start in range(max(first, kts.q), last, step):
+        stop = min(start + step, last)
+        develop(remainder_blocks[start - kts.q:stop - kts.q, np.newaxis], offsets[np.newaxis, :, np.newaxis],
+                kts.field, fixed, out[start - first:stop - first])
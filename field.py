@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+from functools import lru_cache
+
+from numbthy import find_primitive_root, factor
+
+
+class FieldContext:
+    """
+    Precomputed arithmetic of Galois Field GF(q), q = p^k, used by KTS constructions.
+    Elements are integers 0 .. q - 1 whose digits in base p are coefficients of polynomials
+    modulo primitive polynomial of degree k (for k = 1 simply integers modulo p).
+    Holds primitive element alpha, t = (q - 1) / 6, m satisfying 2 * alpha^m = alpha^t + 1
+    and exp/log/Zech tables, so block builders only do table lookups.
+    Number of primitive root (or polynomial) candidates tested to find alpha is kept as candidates.
+    """
+
+    def __init__(self, q, alpha=None, generator=None, m=None):
+        """
+        Obtain alpha, tables of powers (exp) and discrete logarithms (log) to the base alpha,
+        Zech logarithms and m.
+        Raise ValueError if given alpha is not primitive element.
+        :param q: order of Galois Field (prime power)
+        :param alpha: primitive element to use instead of the least one, see primitive_elements
+        :param generator: the least primitive root (k = 1) or primitive polynomial (k > 1) known
+            in advance, e.g. from catalog, so it is not searched for
+        :param m: m of the used primitive element (alpha if given) known in advance, for k = 1 Zech
+            logarithms are not needed then and their table is None
+        """
+        ((self.p, self.k),) = factor(q)
+        self.q = q
+        self.t = int((q - 1) / 6)
+
+        if self.k == 1:
+            # alpha is the least primitive root modulo prime
+            self.polynomial = None
+            self.alpha = find_primitive_root(q) if generator is None else generator
+            self.candidates = self.alpha - 1 if generator is None else 0
+            self.powers = [1] * (q - 1)
+            for e in range(1, q - 1):
+                self.powers[e] = self.powers[e - 1] * self.alpha % q
+        elif generator is not None:
+            self.alpha = self.p
+            self.candidates = 0
+            self.polynomial = generator
+            self.powers = self.power_table(generator)
+            if self.powers is None:
+                raise ValueError('Polynomial %s is not primitive over GF(%s)' % (generator, self.p))
+        else:
+            # alpha is x modulo the least primitive polynomial
+            self.alpha = self.p
+            self.candidates = 0
+            for polynomial in range(1, self.p ** self.k):
+                if polynomial % self.p == 0:
+                    continue
+                self.candidates += 1
+                self.powers = self.power_table(polynomial)
+                if self.powers is not None:
+                    self.polynomial = polynomial
+                    break
+
+        # other primitive element is power of the least one with exponent coprime to q - 1
+        if alpha is not None and alpha != self.alpha:
+            exponent = self.powers.index(alpha) if 0 < alpha < q else 0
+            if math.gcd(exponent, q - 1) != 1:
+                raise ValueError('%s is not primitive element of GF(%s)' % (alpha, q))
+            self.powers = [self.powers[exponent * e % (q - 1)] for e in range(q - 1)]
+            self.alpha = alpha
+
+        # powers of alpha, table is twice the group order long, so sum of two exponents needs no reduction
+        self.powers += self.powers
+
+        self.logs = [0] * q
+        for e in range(q - 1):
+            self.logs[self.powers[e]] = e
+
+        # Zech logarithms --> alpha^zech[n] = 1 + alpha^n, -1 when 1 + alpha^n = 0
+        # (only field addition of prime power order uses them besides m)
+        self.zech = None
+        if self.k > 1 or m is None:
+            self.zech = [-1] * (q - 1)
+            for n in range(q - 1):
+                element = self.powers[n]
+                one_plus = element - element % self.p + (element % self.p + 1) % self.p
+                if one_plus:
+                    self.zech[n] = self.logs[one_plus]
+
+        # let m satisfy the equation --> 2 * alpha^m = alpha^t + 1
+        self.m = (self.zech[self.t] - self.logs[2]) % (q - 1) if m is None else m
+
+        self.negatives = [self.mul(element, self.powers[(q - 1) // 2]) for element in range(q)]
+        self.arrays = None
+
+    def primitive_elements(self):
+        """
+        :return: list of all primitive elements (generators of multiplicative group), alpha first
+        """
+        return [self.powers[e] for e in range(1, self.q - 1) if math.gcd(e, self.q - 1) == 1]
+
+    def power_table(self, polynomial):
+        """
+        Powers of x modulo monic polynomial x^k + c_(k-1) x^(k-1) + ... + c_0 over GF(p).
+        :param polynomial: coefficients c_0 .. c_(k-1) as digits in base p
+        :return: list of q - 1 powers of x, None when polynomial is not primitive
+        """
+        p, q, top = self.p, self.q, self.p ** (self.k - 1)
+        reduction = [(p - polynomial // p ** i % p) % p for i in range(self.k)]
+        powers, element = [1] * (q - 1), 1
+        for e in range(1, q - 1):
+            # multiply by x and replace x^k by -(c_(k-1) x^(k-1) + ... + c_0)
+            carry, element = element // top, element % top * p
+            if carry:
+                element = sum((element // p ** i % p + carry * reduction[i]) % p * p ** i for i in range(self.k))
+            if element == 1:
+                return None
+            powers[e] = element
+        return powers
+
+    def add(self, a, b):
+        """
+        Field addition, by Zech logarithm --> a + b = a * (1 + b / a).
+        """
+        if self.k == 1:
+            result = a + b
+            return result if result < self.q else result - self.q
+        if a == 0:
+            return b
+        if b == 0:
+            return a
+        n = self.logs[b] - self.logs[a]
+        z = self.zech[n if n >= 0 else n + self.q - 1]
+        return self.powers[self.logs[a] + z] if z >= 0 else 0
+
+    def sub(self, a, b):
+        """
+        Field subtraction.
+        """
+        if self.k == 1:
+            result = a - b
+            return result if result >= 0 else result + self.q
+        return self.add(a, self.negatives[b])
+
+    def mul(self, a, b):
+        """
+        Field multiplication by logarithms.
+        """
+        if a == 0 or b == 0:
+            return 0
+        return self.powers[self.logs[a] + self.logs[b]]
+
+    def numpy_tables(self):
+        """
+        Exp, log and Zech tables as NumPy arrays, see add_array.
+        """
+        if self.arrays is None:
+            import numpy as np
+            self.arrays = tuple(np.array(table, dtype=np.int64) for table in (self.powers, self.logs, self.zech))
+        return self.arrays
+
+    def add_array(self, a, b, out):
+        """
+        Vectorized field addition (requires NumPy).
+        :param a: array of elements
+        :param b: array of elements broadcastable against a
+        :param out: array receiving a + b
+        """
+        import numpy as np
+        if self.k == 1:
+            np.add(a, b, out=out)
+            np.remainder(out, self.q, out=out)
+            return out
+
+        powers, logs, zech = self.numpy_tables()
+        a, b = np.broadcast_arrays(a, b)
+        log_a = logs[a]
+        z = zech[(logs[b] - log_a) % (self.q - 1)]
+        out[...] = np.where(z >= 0, powers[log_a + z], 0)
+        np.copyto(out, b, where=a == 0)
+        np.copyto(out, a, where=b == 0)
+        return out
+
+
+@lru_cache(maxsize=64)
+def get_field(q, alpha=None, generator=None, m=None):
+    """
+    Field context shared by all KTS instances of the same q (and alpha).
+    :param q: order of Galois Field
+    :param alpha: primitive element, None for the least one
+    :param generator: the least primitive root or primitive polynomial known in advance, see FieldContext
+    :param m: m of the used primitive element known in advance
+    :return: FieldContext
+    """
+    return FieldContext(q, alpha, generator, m)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in instrumentation of KTS: wall and CPU timers of phases, counters and hooks
+for external metrics. KTS without instrumentation skips all of it, see KTS.phase and KTS.count.
+
+    instrumentation = Instrumentation(hooks=[lambda kind, name, value: print(kind, name, value)])
+    KTS(99, instrumentation=instrumentation).solve()
+    print(instrumentation.format_report())
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """
+    Accumulated times of phases (by name) and counters of one or more KTS instances.
+    """
+
+    def __init__(self, hooks=()):
+        """
+        :param hooks: callables hook(kind, name, value) called when a phase ends
+            (kind 'phase', value tuple (wall seconds, CPU seconds)) or counter is increased
+            (kind 'counter', value the increment)
+        """
+        self.phases = {}    # i.e.   'develop' [calls, wall seconds, CPU seconds]
+        self.counters = {}  # i.e.   'classes' 49
+        self.hooks = list(hooks)
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the body of with statement as phase of given name, nested phases are timed separately.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            totals = self.phases.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+            for hook in self.hooks:
+                hook('phase', name, (wall, cpu))
+
+    def count(self, name, increment=1):
+        self.counters[name] = self.counters.get(name, 0) + increment
+        for hook in self.hooks:
+            hook('counter', name, increment)
+
+    def report(self):
+        """
+        :return: dictionary {'phases': {name: {'calls': ..., 'wall': ..., 'cpu': ...}}, 'counters': {name: value}}
+        """
+        return {
+            'phases': {name: {'calls': calls, 'wall': wall, 'cpu': cpu}
+                       for name, (calls, wall, cpu) in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def format_report(self):
+        """
+        :return: table of phases (in order of their first end) and counters
+        """
+        total = sum(wall for _, wall, _ in self.phases.values()) or 1.0
+        lines = ['%-20s  %6s  %10s  %10s  %6s' % ('phase', 'calls', 'wall [s]', 'cpu [s]', 'wall %')]
+        for name, (calls, wall, cpu) in self.phases.items():
+            lines.append('%-20s  %6s  %10.6f  %10.6f  %6.1f' % (name, calls, wall, cpu, 100 * wall / total))
+        for name, value in self.counters.items():
+            lines.append('%-20s  %6s' % (name, value))
+        return '\n'.join(lines) + '\n'
@@ -1,7 +1,21 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from numbthy import is_primitive_root, power_mod, factor
+import sys
+from array import array
+from contextlib import nullcontext
+from itertools import chain
+
+from catalog import lookup
+from field import get_field
+from numbthy import factor, find_primitive_root, prime_power_sieve
+from solution import KTSSolution
+
+# shared context manager of phases when instrumentation is disabled
+NO_PHASE = nullcontext()
+
+# method name of KTS found by local search, see localsearch
+LOCAL_SEARCH = 'Local search'
 
 
 class KTS:
@@ -9,12 +23,17 @@ class KTS:
     Kirkman Triple System (KTS)
     """
 
-    def __init__(self, order):
+    def __init__(self, order, instrumentation=None, alpha=None, search=None):
         """
         Initialize with proper construction method.
         Raise ValueError if KTS order number does not satisfy necessary condition
         for creation of Kirkman Triple System.
         :param order: order of KTS, e.g. number of participants
+        :param instrumentation: instrument.Instrumentation timing phases and counting work, None disables it
+        :param alpha: primitive element of Galois Field used by construction, None for the default one
+            (see default_alpha); other primitive elements give other (possibly non-isomorphic) KTS, see variants
+        :param search: time budget in seconds of local search for orders no construction applies to,
+            see localsearch; None raises ValueError for such orders
         """
         if order % 6 != 3:
             raise ValueError(
@@ -22,30 +41,75 @@ class KTS:
                 'Try for example order of 15.' % order
             )
 
+        # precomputed parameters, computed for orders beyond catalog
+        try:
+            construction = lookup(order)
+        except KeyError:
+            construction = self.find_construction(order)
+        self.method_name, self.q, self.generator, self.default_alpha, self.m = construction or (None,) * 5
+
         # Construction 1.1 [45, Theorem 6]
-        self.q = int(order / 2)
-        if order % 2 == 1 and self.is_prime_power(self.q) and self.q % 6 == 1:
-            self.method_name = 'Construction 1.1'
+        if self.method_name == 'Construction 1.1':
+            self.groups = 2
             self.create_blocks = self.create_blocks_1
             self.create_parallel = self.create_parallel_1
+            self.create_base_blocks = self.create_base_blocks_1
 
         # Construction 1.2 [45, Theorem 5]
+        elif self.method_name == 'Construction 1.2':
+            self.groups = 3
+            self.create_blocks = self.create_blocks_2
+            self.create_parallel = self.create_parallel_2
+            self.create_base_blocks = self.create_base_blocks_2
+
+        # 1-rotational or bicyclic KTS over Z_q found by local search
+        elif search is not None:
+            from localsearch import searcher
+            self.method_name = LOCAL_SEARCH
+            self.q = searcher(order).group
+            self.groups = None
+            self.create_blocks = self.create_parallel = self.create_base_blocks = None
         else:
-            self.q = int(order / 3)
-            if order % 3 == 0 and self.is_prime_power(self.q) and self.q % 6 == 1:
-                self.method_name = 'Construction 1.2'
-                self.create_blocks = self.create_blocks_2
-                self.create_parallel = self.create_parallel_2
-            else:
-                raise ValueError('Not possible to solve the problem for order %s' % order)
+            raise ValueError('Not possible to solve the problem for order %s' % order)
 
+        self.instrumentation = instrumentation
+        self.alpha = alpha
+        self.search = search
         self.order = order
         self.t = int((self.q - 1) / 6)
+        self.num_days = int((order - 1) / 2)
 
         self.points = range(1, order + 1)
+        self.base_blocks = None
+        self.base_index = None
         self.blocks = {}
         self.classes = {}
-        self.solution = {}
+        self.solution = None
+        self.pair_index = None
+
+    @property
+    def field(self):
+        """
+        Galois Field (self.q) arithmetic, created on first use and shared by all KTS of the same q and alpha.
+        """
+        if self.alpha is not None:
+            return get_field(self.q, self.alpha, self.generator)
+        return get_field(self.q, self.default_alpha, self.generator, self.m)
+
+    def phase(self, name):
+        """
+        Context manager timing phase of given name by instrumentation, shared no-op when disabled.
+        """
+        if self.instrumentation is None:
+            return NO_PHASE
+        return self.instrumentation.phase(name)
+
+    def count(self, name, increment=1):
+        """
+        Increase counter of given name by instrumentation, if enabled.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, increment)
 
     @staticmethod
     def is_prime_power(n):
@@ -56,27 +120,294 @@ class KTS:
             return True
         return False
 
-    def solve(self):
+    @classmethod
+    def find_construction(cls, order):
         """
-        Solve problem by construction 1.1 or 1.2 depending on KTS order.
-        :return: dictionary of days containing array of triples for each day
+        Choose construction of given order (satisfying "order `mod` 6 = 3") by factoring q, see catalog.lookup.
+        :return: tuple (method name, q, None, default alpha, None), None if no construction applies
         """
-        self.create_parallel()
-        day = 0
-        for class_blocks in self.classes.values():
-            day += 1
-            for block_triple in class_blocks.values():
-                self.solution.setdefault(day, []).append(block_triple)
+        q = order // 2
+        if cls.is_prime_power(q) and q % 6 == 1:
+            return 'Construction 1.1', q, None, cls.default_alpha_of('Construction 1.1', q), None
+        q = order // 3
+        if cls.is_prime_power(q) and q % 6 == 1:
+            return 'Construction 1.2', q, None, None, None
+        return None
+
+    @staticmethod
+    def default_alpha_of(method_name, q):
+        """
+        Default primitive element keeps output of the original implementation: it took the last primitive
+        root modulo prime q in Construction 1.1, i.e. the greatest one, and the least one in Construction 1.2.
+        :return: primitive element, None for the least one (also for q = p^k, k > 1)
+        """
+        if method_name == 'Construction 1.1' and factor(q)[0][1] == 1:
+            return find_primitive_root(q, greatest=True)
+        return None
+
+    @staticmethod
+    def feasible_orders(limit):
+        """
+        Classify all orders satisfying "order `mod` 6 = 3" up to limit at once, by sieve of prime powers
+        (one byte per possible q) instead of factoring each q.
+        :param limit: the greatest order
+        :return: iterator of (order, method name, q), method name and q are None when no construction applies
+        """
+        prime_powers = prime_power_sieve(limit // 2 + 1)
+        for order in range(3, limit + 1, 6):
+            q = order // 2
+            if prime_powers[q] and q % 6 == 1:
+                yield order, 'Construction 1.1', q
+                continue
+            q = order // 3
+            if prime_powers[q] and q % 6 == 1:
+                yield order, 'Construction 1.2', q
+            else:
+                yield order, None, None
+
+    def solve(self, vectorized=False, pair_index=False, cache=None, processes=None):
+        """
+        Solve problem by construction 1.1 or 1.2 depending on KTS order, or by local search.
+        :param vectorized: develop base blocks by NumPy engine, see engine.develop_classes
+        :param processes: develop base blocks by NumPy engine in given number of worker processes,
+            see parallel.develop_parallel; local search runs restarts in them, see localsearch.search
+        :param pair_index: build index of pairs of points along, see meeting
+        :param cache: SolutionCache to load solution from, or to store computed solution to
+        :return: KTSSolution with array of triples for each day
+        """
+        self.solution = None
+        if cache is not None:
+            with self.phase('cache_load'):
+                self.solution = cache.load(self)
+
+        if self.solution is None:
+            if self.method_name == LOCAL_SEARCH:
+                from localsearch import search
+                with self.phase('search'):
+                    self.solution = search(self, processes)
+            else:
+                self.get_base_blocks()
+                with self.phase('develop'):
+                    if processes is not None and processes > 1:
+                        from parallel import develop_parallel
+                        triples = develop_parallel(self, processes)
+                    elif vectorized:
+                        from engine import develop_classes
+                        triples = develop_classes(self)
+                    else:
+                        triples = array('I')
+                        for blocks in self.iter_days():
+                            triples.extend(chain.from_iterable(blocks))
+                    self.solution = KTSSolution(self.order, triples)
+            self.count('classes', self.num_days)
+            self.count('triples', self.num_days * self.order // 3)
+
+            if cache is not None:
+                with self.phase('cache_store'):
+                    cache.store(self, self.solution)
+
+        self.pair_index = None
+        if pair_index:
+            self.build_pair_index()
         return self.solution
 
+    def build_pair_index(self):
+        """
+        Index day and block of meeting of each pair of points (requires NumPy), solve KTS first if needed.
+        :return: PairIndex
+        """
+        from pairindex import PairIndex
+        if self.solution is None:
+            self.solve(vectorized=True)
+        with self.phase('pair_index'):
+            self.pair_index = PairIndex(self.solution)
+        return self.pair_index
+
+    def meeting(self, x, y):
+        """
+        Find when two points meet, i.e. are in the same triple.
+        :param x: point counted from one
+        :param y: point counted from one
+        :return: tuple (day counted from zero, triple)
+        """
+        pair_index = self.pair_index or self.build_pair_index()
+        day, block = pair_index.meeting(x, y)
+        slot = day * self.solution.blocks_per_day + block
+        return day, tuple(self.solution.points[3 * slot:3 * slot + 3].tolist())
+
+    def meetings(self, x, y):
+        """
+        Find when pairs of points meet.
+        :param x: array of points counted from one
+        :param y: array of points counted from one
+        :return: tuple (array of days, array of blocks) both counted from zero, see KTSSolution.array
+        """
+        pair_index = self.pair_index or self.build_pair_index()
+        return pair_index.meetings(x, y)
+
+    def variants(self, processes=None, unique=True):
+        """
+        Enumerate KTS of this order for all primitive elements alpha (requires NumPy), see variants.variants.
+        :param processes: solve variants by given number of worker processes
+        :param unique: skip variants with already seen invariant fingerprint
+        :return: iterator of dictionaries with alpha, m, validity and fingerprint, as they are found;
+            KTS(order, alpha=alpha) builds the variant
+        """
+        from variants import variants
+        return variants(self.order, processes, unique)
+
+    def relabel(self, permutation=None, seed=None, shuffle_days=False):
+        """
+        Isomorphic KTS with points (and days) permuted, by one gather over the solution
+        (requires NumPy), solve KTS first if needed. See relabel.relabel.
+        :param permutation: sequence of new points, point x is replaced by permutation[x - 1];
+            random permutation when None
+        :param seed: seed of random permutation of points and of days
+        :param shuffle_days: put days to random order too
+        :return: KTSSolution
+        """
+        from relabel import relabel
+        if self.solution is None:
+            self.solve(vectorized=True)
+        with self.phase('relabel'):
+            return relabel(self.solution, permutation, seed, shuffle_days)
+
+    def roster_days(self, roster, solution=None):
+        """
+        Schedule of named participants (requires NumPy), solve KTS first if needed.
+        :param roster: sequence of order participants, point x is participant roster[x - 1]
+        :param solution: KTSSolution to use instead of self.solution, e.g. relabeled one
+        :return: iterator of lists of triples of participants, one list for each day
+        """
+        from relabel import roster_days
+        if solution is None:
+            solution = self.solution or self.solve(vectorized=True)
+        return roster_days(solution, roster)
+
+    def least_overlap(self, tracker, roster=None, days=None, processes=None, seed=None):
+        """
+        Relabeling of this KTS for the next event of a series with the least pairs of participants
+        who already met (requires NumPy), solve KTS first if needed. See tracker.optimize.
+        :param tracker: tracker.MeetingTracker of previous events
+        :param roster: sequence of order participants (numbered from one), point x is participant roster[x - 1]
+        :param days: number of days the event takes, None for all
+        :param processes: run restarts of optimization in given number of worker processes
+        :param seed: seed of optimization
+        :return: tuple (permutation for relabel, list of chosen days counted from zero, number of met pairs)
+        """
+        from tracker import optimize
+        if self.solution is None:
+            self.solve(vectorized=True)
+        with self.phase('least_overlap'):
+            return optimize(tracker, self.solution, roster, days, processes=processes, seed=seed)
+
+    def iter_days(self):
+        """
+        Generate parallel classes one by one without keeping all of them in memory.
+        :return: iterator of lists of triples, one list for each day
+        """
+        if self.method_name == LOCAL_SEARCH:
+            yield from self.solution or self.solve()
+            return
+        for d in range(self.num_days):
+            yield self.get_day(d)
+
+    def get_day(self, d):
+        """
+        Obtain one parallel class without solving the others.
+        Remainder classes of Construction 1.2 are developed directly from their blocks,
+        KTS found by local search is solved first.
+        :param d: day number counted from zero
+        :return: list of triples
+        """
+        if not 0 <= d < self.num_days:
+            raise IndexError('Day %s out of range of %s days' % (d, self.num_days))
+        if self.method_name == LOCAL_SEARCH:
+            return (self.solution or self.solve()).day(d)
+
+        class_blocks, remainder_blocks = self.get_base_blocks()
+        if d < self.q:
+            points = self.develop([code for block in class_blocks for code in block], d)
+            return list(zip(points[0::3], points[1::3], points[2::3]))
+
+        block = remainder_blocks[d - self.q]
+        return [tuple(self.develop(block, number)) for number in range(self.q)]
+
+    def point_schedule(self, point):
+        """
+        Obtain triples containing given point for all days, without solving KTS.
+        :param point: point number counted from one
+        :return: list of triples, one for each day
+        """
+        if point not in self.points:
+            raise ValueError('Point %s is not in range of points %s' % (point, self.points))
+        if self.method_name == LOCAL_SEARCH:
+            return [next(block for block in blocks if point in block) for blocks in self.solution or self.solve()]
+
+        class_blocks, remainder_blocks = self.get_base_blocks()
+        if self.base_index is None:
+            self.base_index = {code: i for i, block in enumerate(class_blocks) for code in block}
+
+        q, code = self.q, point - 1
+        group, element = code // q, code % q
+        schedule = []
+
+        # point belongs to the base block developed by 'number' from the base block of 'code - number'
+        for number in range(q):
+            if code >= self.groups * q:
+                block = class_blocks[self.base_index[code]]
+            else:
+                block = class_blocks[self.base_index[group * q + self.sub_mod(element, number)]]
+            schedule.append(tuple(self.develop(block, number)))
+
+        # remainder block has exactly one point in each group
+        for block in remainder_blocks:
+            number = self.sub_mod(element, block[group] % q)
+            schedule.append(tuple(self.develop(block, number)))
+
+        return schedule
+
+    def develop(self, codes, number):
+        """
+        Develop points of base blocks through Galois Field (self.q).
+        :param codes: point codes of base blocks, see get_base_blocks
+        :param number: iteration (offset) number according to Galois Field
+        :return: list of points
+        """
+        q, fixed, add = self.q, self.groups * self.q, self.field.add
+        return [code + 1 if code >= fixed else code - code % q + add(code % q, number) + 1
+                for code in codes]
+
+    def get_base_blocks(self):
+        """
+        Base blocks are created only once per instance, see create_base_blocks_1 and create_base_blocks_2.
+        Points of base blocks are coded as 'group * q + element' counted from zero. Codes beyond
+        self.groups developed through Galois Field (i.e. point infinity in Construction 1.1) stay fixed.
+        :return: tuple (class blocks, remainder blocks); class blocks develop to one parallel class
+            per each field element, each remainder block develops to one more parallel class
+        """
+        if self.base_blocks is None:
+            with self.phase('field'):
+                field = self.field
+            self.count('primitive_candidates', field.candidates)
+            with self.phase('base_blocks'):
+                self.base_blocks = self.create_base_blocks()
+            self.count('base_blocks', len(self.base_blocks[0]) + len(self.base_blocks[1]))
+        return self.base_blocks
+
     def create_parallel_1(self):
         """
         Construction 1.1
         Obtain parallel classes by developing through Galois Field (self.q)
         """
-        for i in range(self.q):
-            self.create_blocks(i)
-            self.classes[i] = self.blocks
+        with self.phase('field'):
+            field = self.field
+        self.count('primitive_candidates', field.candidates)
+        with self.phase('create_blocks'):
+            for i in range(self.q):
+                self.create_blocks(i)
+                self.classes[i] = self.blocks
+        self.count('blocks', self.q * len(self.blocks))
 
     def create_blocks_1(self, number=0):
         """
@@ -85,18 +416,10 @@ class KTS:
         :param number: iteration (offset) number according to Galois Field
         """
 
-        # first obtain alpha (primitive element in Galois Field) and m (by specified equation)
-        alpha, m = 0, 0
-        for a in range(self.q):
-            if is_primitive_root(a, self.q):
-                for _m in range(self.q):
-                    # let me satisfy the equation --> 2 * alpha^m = alpha^t + 1
-                    right = self.add_mod(power_mod(a, self.t, self.q), 1)
-                    _a = power_mod(a, _m, self.q)
-                    left = self.add_mod(_a, _a)
-                    if left == right:
-                        alpha, m = a, _m
-                        break
+        # alpha (primitive element in Galois Field) and m (2 * alpha^m = alpha^t + 1)
+        # are shared by all classes, see FieldContext
+        m = self.field.m
+        power = self.field.powers
 
         # split points to groups
         groups = {
@@ -114,86 +437,112 @@ class KTS:
         # references A_i, B_i
         for i in range(0, self.t):
             self.blocks['a' + str(i)] = \
-                (get(power_mod(alpha, i + m + self.t, self.q), 2),
-                 get(power_mod(alpha, i + m + 3 * self.t, self.q), 2),
-                 get(power_mod(alpha, i + m + 5 * self.t, self.q), 2))
+                (get(power[i + m + self.t], 2),
+                 get(power[i + m + 3 * self.t], 2),
+                 get(power[i + m + 5 * self.t], 2))
 
             self.blocks['b' + str(i)] = \
-                (get(power_mod(alpha, i, self.q), 1),
-                 get(power_mod(alpha, i + self.t, self.q), 1),
-                 get(power_mod(alpha, i + m, self.q), 2))
+                (get(power[i], 1),
+                 get(power[i + self.t], 1),
+                 get(power[i + m], 2))
 
         # references B_i
         for i in range(2 * self.t, 3 * self.t):
             self.blocks['b' + str(i)] = \
-                (get(power_mod(alpha, i, self.q), 1),
-                 get(power_mod(alpha, i + self.t, self.q), 1),
-                 get(power_mod(alpha, i + m, self.q), 2))
+                (get(power[i], 1),
+                 get(power[i + self.t], 1),
+                 get(power[i + m], 2))
 
         # references B_i
         for i in range(4 * self.t, 5 * self.t):
             self.blocks['b' + str(i)] = \
-                (get(power_mod(alpha, i, self.q), 1),
-                 get(power_mod(alpha, i + self.t, self.q), 1),
-                 get(power_mod(alpha, i + m, self.q), 2))
+                (get(power[i], 1),
+                 get(power[i + self.t], 1),
+                 get(power[i + m], 2))
+
+    def create_base_blocks_1(self):
+        """
+        Construction 1.1
+        Obtain base blocks of the parallel class for offset 0, in the same order as create_blocks_1.
+        """
+        q, t, m = self.q, self.t, self.field.m
+        power = self.field.powers
+
+        # references A^0, infinity is the last point
+        class_blocks = [(0, q, 2 * q)]
+
+        # references A_i, B_i
+        for i in range(0, t):
+            class_blocks.append((q + power[i + m + t], q + power[i + m + 3 * t], q + power[i + m + 5 * t]))
+            class_blocks.append((power[i], power[i + t], q + power[i + m]))
+
+        # references B_i
+        for i in list(range(2 * t, 3 * t)) + list(range(4 * t, 5 * t)):
+            class_blocks.append((power[i], power[i + t], q + power[i + m]))
+
+        return class_blocks, []
 
     def create_parallel_2(self):
         """
         Construction 1.2
         Obtain parallel classes by developing through Galois Field (self.q).
-        Other parallel classes are made from 'a_i' blocks. These are referenced as remainder
-        triples which means, that these triples are arranged by 'block_key' with values
+        Other parallel classes are made from A_i blocks. These are referenced as remainder
+        triples which means, that these triples are arranged by block key with values
         constructed as (origin class name, triple).
+        Block keys are tuples (kind, i, j), see create_blocks_2.
         """
 
         # first obtain all parallel classes developing through Galois Field
         # but set of parallel classes are super set of real parallel classes at the moment
         self.create_parallel_1()
 
-        real_classes = {}       # i.e.   0  { 'a_': (1, 8, 15) ,  'b0,1': (2, 3, 5), ... }
-        remainder_triples = {}  # i.e.   a2 {    0: (3, 12, 16),       1: (4, 13, 17), ... }
+        with self.phase('partition'):
+            self.partition_classes()
+        self.count('classes', len(self.classes))
+
+    def partition_classes(self):
+        """
+        Construction 1.2
+        Split super sets of parallel classes to real parallel classes and remainder triples.
+        """
+        real_classes = {}       # i.e.          0  { ('a', None, None): (1, 8, 15),  ('b', 0, 1): (2, 3, 5), ... }
+        remainder_triples = {}  # i.e.   ('a', 2, None) {                 0: (3, 12, 16),            1: (4, 13, 17), ... }
 
         # split super set to get real parallel classes and remainder triples
         for class_key, class_blocks in self.classes.items():
             real_classes[class_key] = {}
 
             for block_key, block_triple in class_blocks.items():
-                i = block_key[1]
-
-                # 'a_i' blocks logic
-                if block_key[0] == 'a':
-                    if i == '_' \
-                            or self.t <= int(i) <= 2 * self.t - 1 \
-                            or 3 * self.t <= int(i) <= 4 * self.t - 1 \
-                            or 5 * self.t <= int(i) <= 6 * self.t - 1:
-                        real_classes[class_key][block_key] = block_triple
-                    else:
-                        remainder_triples.setdefault(block_key, {})[class_key] = block_triple
-
-                # 'b_i' blocks logic
-                elif block_key[0] == 'b':
-                    if 0 <= int(i) <= self.t - 1:
-                        real_classes[class_key][block_key] = block_triple
-                    else:
-                        remainder_triples.setdefault(block_key, {})[class_key] = block_triple
+                if self.is_real_block(block_key):
+                    real_classes[class_key][block_key] = block_triple
+                else:
+                    remainder_triples.setdefault(block_key, {})[class_key] = block_triple
 
         self.classes = {}
         self.classes.update(real_classes)
         self.classes.update(remainder_triples)
 
+    def is_real_block(self, block_key):
+        """
+        Construction 1.2
+        Real parallel class consists of A^0, all B_i,j (0 <= i < t) and A_i for t <= i < 2t,
+        3t <= i < 4t, 5t <= i < 6t, the other A_i are remainder blocks.
+        :param block_key: tuple (kind, i, j), see create_blocks_2
+        """
+        kind, i, _ = block_key
+        return i is None or kind == 'b' or (i // self.t) % 2 == 1
+
     def create_blocks_2(self, number=0):
         """
         Construction 1.2
         Obtain blocks that create super set of one parallel class.
+        Blocks are keyed by tuples (kind, i, j): ('a', None, None) for A^0, ('b', i, j) for B_i,j
+        and ('a', i, None) for A_i.
         :param number: iteration (offset) number according to Galois Field
         """
 
-        # first obtain alpha (primitive element in Galois Field)
-        alpha = 0
-        for a in range(self.q):
-            if is_primitive_root(a, self.q):
-                alpha = a
-                break
+        # alpha (primitive element in Galois Field) is shared by all classes, see FieldContext
+        power = self.field.powers
 
         # split points to groups
         groups = {
@@ -205,63 +554,101 @@ class KTS:
         get = lambda index, group: groups[group][self.add_mod(index, number)]
 
         # references A^0
-        self.blocks = {'a_': (groups[1][number], groups[2][number], groups[3][number])}
+        self.blocks = {('a', None, None): (groups[1][number], groups[2][number], groups[3][number])}
 
         # references B_i,j
         for i in range(0, self.t):
             for j in (1, 2, 3):
-                self.blocks['b' + str(i) + ',' + str(j)] = \
-                    (get(power_mod(alpha, i, self.q), j),
-                     get(power_mod(alpha, i + 2 * self.t, self.q), j),
-                     get(power_mod(alpha, i + 4 * self.t, self.q), j))
+                self.blocks['b', i, j] = \
+                    (get(power[i], j),
+                     get(power[i + 2 * self.t], j),
+                     get(power[i + 4 * self.t], j))
 
         # references A_i
         for i in range(0, 6 * self.t):
-            self.blocks['a' + str(i)] = \
-                (get(power_mod(alpha, i, self.q), 1),
-                 get(power_mod(alpha, i + 2 * self.t, self.q), 2),
-                 get(power_mod(alpha, i + 4 * self.t, self.q), 3))
+            self.blocks['a', i, None] = \
+                (get(power[i], 1),
+                 get(power[i + 2 * self.t], 2),
+                 get(power[i + 4 * self.t], 3))
 
-    def test_classes(self):
+    def create_base_blocks_2(self):
         """
-        Test all parallel classes blocks for uniqueness and completeness within the class.
+        Construction 1.2
+        Obtain base blocks of the real parallel class for offset 0 (A^0, B_i,j and A_i for
+        t <= i < 2t, 3t <= i < 4t, 5t <= i < 6t) and remainder blocks (A_i for other i), which
+        develop to remainder classes.
         """
-        triples = set()
-        for c in self.classes.values():
-            row = set()
-            for b in c.values():
-                triples.add(b)
-                [row.add(x) for x in b]
+        q, t = self.q, self.t
+        power = self.field.powers
 
-            assert len(row) == self.order, \
-                'There are missing %s / %s values in class' % (len(row), self.order)
-        assert len(triples) == len(self.classes) * len(self.classes[0]), \
-            'There are some triples more times than one'
+        # references A^0
+        class_blocks = [(0, q, 2 * q)]
+
+        # references B_i,j
+        for i in range(0, t):
+            for j in range(3):
+                class_blocks.append((j * q + power[i], j * q + power[i + 2 * t], j * q + power[i + 4 * t]))
+
+        # references A_i
+        remainder_blocks = []
+        for i in range(0, 6 * t):
+            block = (power[i], q + power[i + 2 * t], 2 * q + power[i + 4 * t])
+            if (i // t) % 2:
+                class_blocks.append(block)
+            else:
+                remainder_blocks.append(block)
+
+        return class_blocks, remainder_blocks
+
+    def test_classes(self, sample=None, processes=None):
+        """
+        Test that all days are parallel classes and each pair of points is in exactly one triple,
+        see verify.verify. Without solution parallel classes of create_parallel are tested.
+        :param sample: test only given number of randomly chosen days
+        :param processes: split days between given number of worker processes
+        """
+        from verify import check_triples, verify
+        with self.phase('verify'):
+            if self.solution is None:
+                check_triples(self.order, enumerate((list(blocks.values()) for blocks in self.classes.values()), 1))
+            else:
+                verify(self.solution, sample=sample, processes=processes)
 
     def add_mod(self, number, addition):
-        result = number + addition
-        return result if result < self.q else result % self.q
+        return self.field.add(number, addition)
+
+    def sub_mod(self, number, subtraction):
+        return self.field.sub(number, subtraction)
 
     def print_classes(self):
         for k, v in self.classes.items():
             print(k, v)
 
-    def print_solution(self, print_heading=False):
-        if print_heading:
-            print(self)
-        for day, blocks in self.solution.items():
-            print('Day %2s: ' % day, end='')
-            for block_triple in blocks:
-                print(str(block_triple).ljust(12), end='  ')
-            print()
+    def print_solution(self, print_heading=False, stream=False):
+        """
+        :param print_heading: print description of KTS first
+        :param stream: print days generated one by one by iter_days, instead of solution
+        """
+        from writers import TextWriter
+        with self.phase('write'):
+            TextWriter(sys.stdout).write(self, enumerate(self.iter_days(), 1) if stream else self.solution,
+                                         print_heading)
+
+    def print_days(self, days):
+        """
+        :param days: iterable of (day number counted from one, list of triples)
+        """
+        from writers import TextWriter
+        TextWriter(sys.stdout).write(self, days)
 
     def __str__(self):
         return (
             'Kirkman triple system (KTS)\n'
             '  Order: %s \n'
             '  Points %s \n'
-            '  Prime power: %s \n'
+            '  %s: %s \n'
             '  Method used: %s \n'
             '  Solution: %s days' %
-            (self.order, self.points, self.q, self.method_name, len(self.solution))
+            (self.order, self.points, 'Cyclic group order' if self.groups is None else 'Prime power', self.q,
+             self.method_name, self.num_days)
          )
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of KTS phases across ladder of orders of both constructions.
+Each phase is timed (the best of repeated runs) and its peak memory is traced by tracemalloc
+in one more run. Results are written as JSON and can be compared to saved baseline.
+
+    python3 -m kts_bench --output bench.json
+    python3 -m kts_bench --compare bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from field import FieldContext
+from kts import KTS
+
+# orders of Construction 1.1 and Construction 1.2
+ORDERS = (15, 99, 339, 999, 21, 129, 507, 1029)
+
+
+def solved(order):
+    kts = KTS(order)
+    kts.solve()
+    return kts
+
+
+def print_quietly(kts):
+    with contextlib.redirect_stdout(io.StringIO()):
+        kts.print_solution(print_heading=True)
+
+
+def field_of(kts):
+    """
+    Field of KTS as its field property creates it (default alpha, generator and m from catalog),
+    without the cache of get_field shared by repeated runs.
+    """
+    return FieldContext(kts.q, kts.default_alpha, kts.generator, kts.m)
+
+
+# phase name --> (preparation of argument from order, measured action)
+PHASES = {
+    'init': (lambda order: order, KTS),
+    'field': (KTS, field_of),
+    'create_parallel': (KTS, lambda kts: kts.create_parallel()),
+    'solve': (KTS, lambda kts: kts.solve()),
+    'solve_vectorized': (KTS, lambda kts: kts.solve(vectorized=True)),
+    'test_classes': (solved, lambda kts: kts.test_classes()),
+    'print_solution': (solved, lambda kts: print_quietly(kts)),
+}
+
+
+def measure(prepare, action, order, repeat):
+    """
+    :return: dictionary with the best time of repeated runs (seconds) and peak of traced memory (bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        argument = prepare(order)
+        start = time.perf_counter()
+        action(argument)
+        times.append(time.perf_counter() - start)
+
+    argument = prepare(order)
+    tracemalloc.start()
+    try:
+        action(argument)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'time': min(times), 'peak_bytes': peak}
+
+
+def run(orders=ORDERS, phases=tuple(PHASES), repeat=3, log=None):
+    """
+    :return: dictionary of results, {order: {phase: {'time': ..., 'peak_bytes': ...}}}
+    """
+    results = {}
+    for order in orders:
+        kts = KTS(order)
+        results[str(order)] = {'method': kts.method_name}
+        for phase in phases:
+            prepare, action = PHASES[phase]
+            results[str(order)][phase] = measure(prepare, action, order, repeat)
+            if log:
+                print('%6s  %-16s  %10.6f s  %12s B' % (
+                    order, phase, results[str(order)][phase]['time'], results[str(order)][phase]['peak_bytes']),
+                    file=log)
+
+    return {
+        'version': 1,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    Find phases slower, or with greater peak memory, than in baseline by more than threshold.
+    :return: list of descriptions of regressions
+    """
+    regressions = []
+    for order, phases in report['results'].items():
+        for phase, values in phases.items():
+            base = baseline.get('results', {}).get(order, {}).get(phase)
+            if not isinstance(values, dict) or not base:
+                continue
+            for key in ('time', 'peak_bytes'):
+                if base[key] and values[key] > base[key] * (1 + threshold):
+                    regressions.append('%s %s %s: %.6g -> %.6g (%+.0f %%)' % (
+                        order, phase, key, base[key], values[key], 100 * (values[key] / base[key] - 1)))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='kts_bench', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, nargs='+', default=ORDERS, metavar='ORDER')
+    parser.add_argument('--phases', nargs='+', choices=tuple(PHASES), default=tuple(PHASES), metavar='PHASE',
+                        help='phases to measure: %s' % ', '.join(PHASES))
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs of each phase (default 3)')
+    parser.add_argument('--output', metavar='FILE', help='write results to JSON FILE')
+    parser.add_argument('--compare', metavar='FILE', help='compare results to baseline JSON FILE')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as regression (default 0.2)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    :return: exit status, 1 if there are regressions against baseline
+    """
+    args = parse_args(argv)
+    report = run(args.orders, args.phases, args.repeat, log=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print('REGRESSION %s' % regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Search for KTS of orders no construction applies to (e.g. 33, 45 or 81). Searched KTS have cyclic
+automorphism, so only base blocks of one day are searched and the other days are their translates.
+
+1-rotational KTS(v), v = 3, 9 (mod 24): points are Z_(v-1) and infinity, n = (v - 1) / 2, day i
+(0 <= i < n) is the base day developed by i, and the base day is fixed by adding n, i.e. it consists
+of {infinity, 0, n} and pairs of blocks B, B + n. Every pair is covered exactly once iff base blocks
+have each difference 1 .. n - 1 (up to sign) exactly once and their points modulo n are 1 .. n - 1.
+
+Bicyclic KTS(v), v = 15, 21 (mod 24): points are Z_g x {0, 1} and f fixed points (f = 1 for
+v = 3 (mod 12), f = 3 otherwise), g = (v - f) / 2 is odd. The base day developed by Z_g gives g days,
+for f = 3 the last day is fixed: block of the fixed points and short orbits {x, x + g/3, x + 2g/3}
+of both halves. Every pair is covered exactly once iff base blocks have each pure difference (within
+a half, up to sign, except g/3 for f = 3) and each mixed difference (from half 0 to half 1) exactly
+once, and each fixed point is in block with one point of each half.
+No such base day exists for v = 21, which Construction 1.2 covers.
+
+Search has two phases: randomized backtracking splits the differences to shapes of blocks (blocks
+up to translation), then exact cover (algorithm X, the cell with the least candidates first, candidates
+in random order) translates the shapes so that they partition points of the base day. Both phases are
+limited in number of nodes, seeded restarts run independently in worker processes until the first one
+succeeds or time runs out.
+
+Differences of block {a, b, c} of Z_2n satisfy (c - a) = (b - a) + (c - b), so the number of odd
+differences of each block is even. Hence 1-rotational KTS exist only for v = 3, 9 (mod 24).
+"""
+
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Event
+
+from solution import KTSSolution
+from verify import verify
+
+# nodes of backtracking of shapes, and of exact cover of cells, before restart
+SHAPE_NODES = 10000
+COVER_NODES = 20000
+# nodes between checks of time budget and of stop event
+CHECK_NODES = 256
+
+# set by init_worker in worker processes, once a worker succeeds the others stop
+stop_event = None
+
+
+class CyclicSearch:
+    """
+    Search for base blocks of KTS of one order, restarted from seeded random shapes.
+    Shape is a list of its orientations, orientation is a tuple of cells (half, offset)
+    of the block translated by zero.
+    """
+
+    halves = 1
+
+    def __init__(self, order, g, group):
+        """
+        :param order: order of KTS
+        :param g: number of translations of shapes
+        :param group: order of cyclic automorphism group of the KTS
+        """
+        self.order = order
+        self.g = g
+        self.group = group
+        self.blocked = ()         # cells of the base day not covered by shapes
+        self.nodes = 0
+        self.restarts = 0
+        self.deadline = None
+        self.rng = None
+
+    def expired(self):
+        return time.perf_counter() > self.deadline or stop_event is not None and stop_event.is_set()
+
+    def count_node(self):
+        """
+        :return: True if the search should go on
+        """
+        self.nodes += 1
+        return self.nodes % CHECK_NODES or not self.expired()
+
+    def shapes(self):
+        """
+        :return: tuple (shapes, labels) of random differences, labels of shape are needed to make
+            its block (see base_block), None when backtracking fails
+        """
+        raise NotImplementedError
+
+    def base_block(self, label, orientation, translation):
+        """
+        :return: list of points of block (see develop) made by translated shape
+        """
+        raise NotImplementedError
+
+    def develop(self, base_points):
+        """
+        :param base_points: points of base blocks, three per block, see run
+        :return: KTSSolution
+        """
+        raise NotImplementedError
+
+    def cover(self, shapes):
+        """
+        Translate shapes so that they cover each cell of the base day exactly once, by algorithm X.
+        :return: list of (orientation, translation) of each shape, None when search fails
+        """
+        g, cells = self.g, self.halves * self.g
+        blocked = {half * g + offset for half, offset in self.blocked}
+        rows = {}
+        for k, orientations in enumerate(shapes):
+            for o, orientation in enumerate(orientations):
+                for c in range(g):
+                    row = frozenset(half * g + (c + offset) % g for half, offset in orientation)
+                    # symmetric shapes have equal rows, different shapes of the same cells do not
+                    if not row & blocked and (k, row) not in rows:
+                        rows[(k, row)] = (k, o, c)
+        # columns are cells and shapes (cells + k), each must be in exactly one chosen row
+        columns = {column: set() for column in range(cells + len(shapes)) if column not in blocked}
+        row_columns = {}
+        for (k, row), (_, o, c) in rows.items():
+            row_columns[(k, o, c)] = sorted(row) + [cells + k]
+            for column in row_columns[(k, o, c)]:
+                columns[column].add((k, o, c))
+
+        def select(row):
+            removed = []
+            for column in row_columns[row]:
+                for other in columns[column]:
+                    for other_column in row_columns[other]:
+                        if other_column != column:
+                            columns[other_column].discard(other)
+                removed.append(columns.pop(column))
+            return removed
+
+        def deselect(row, removed):
+            for column in reversed(row_columns[row]):
+                columns[column] = removed.pop()
+                for other in columns[column]:
+                    for other_column in row_columns[other]:
+                        if other_column != column:
+                            columns[other_column].add(other)
+
+        chosen, candidates, nodes = [], [], 0
+        while columns:
+            nodes += 1
+            if nodes > COVER_NODES or not self.count_node():
+                return None
+            least = min(map(len, columns.values()))
+            column = self.rng.choice([column for column, rows_of in columns.items() if len(rows_of) == least])
+            options = list(columns[column])
+            self.rng.shuffle(options)
+            candidates.append(options)
+            while not candidates[-1]:
+                candidates.pop()
+                if not candidates:
+                    return None
+                row, removed = chosen.pop()
+                deselect(row, removed)
+            row = candidates[-1].pop()
+            chosen.append((row, select(row)))
+
+        placement = [None] * len(shapes)
+        for (k, o, c), _ in chosen:
+            placement[k] = (o, c)
+        return placement
+
+    def run(self, seeds, deadline):
+        """
+        Search from given seeds one after another until base blocks are found.
+        :param seeds: iterable of seeds of restarts
+        :param deadline: time.perf_counter() value when search gives up
+        :return: list of points of base blocks, None when time ran out or other worker succeeded
+        """
+        self.deadline = deadline
+        for seed in seeds:
+            if self.expired():
+                return None
+            self.rng = random.Random(seed)
+            self.restarts += 1
+            found = self.shapes()
+            if found is None:
+                continue
+            shapes, labels = found
+            placement = self.cover(shapes)
+            if placement is not None:
+                return [point for label, (o, c) in zip(labels, placement) for point in self.base_block(label, o, c)]
+        return None
+
+
+class RotationalSearch(CyclicSearch):
+    """
+    1-rotational KTS: differences 1 .. n - 1 are split to triples {x, y, x + y} or {x, y, z}
+    with x + y + z = 2n, which are blocks {c, c + e1, c + e1 + e2} of Z_2n for (e1, e2) = (x, y)
+    or (-x, -y); their points modulo n are cells 1 .. n - 1.
+    """
+
+    def __init__(self, order):
+        n = (order - 1) // 2
+        super().__init__(order, n, order - 1)
+        self.n = n
+        self.blocked = ((0, 0),)
+
+    def shapes(self):
+        n, rng = self.n, self.rng
+        remaining = [False] + [True] * (n - 1)
+        triples, candidates, nodes = [], [], 0
+        while len(triples) < (n - 1) // 3:
+            nodes += 1
+            if nodes > SHAPE_NODES or not self.count_node():
+                return None
+            # the greatest remaining difference is the greatest of its triple
+            z = max(d for d in range(n) if remaining[d])
+            options = [(x, z - x, z) for x in range(1, (z + 1) // 2) if remaining[x] and remaining[z - x]]
+            options += [(x, 2 * n - z - x, z) for x in range(max(1, 2 * n - 2 * z + 1), n - z // 2)
+                        if remaining[x] and remaining[2 * n - z - x]]
+            rng.shuffle(options)
+            candidates.append(options)
+            while not candidates[-1]:
+                candidates.pop()
+                if not candidates:
+                    return None
+                for d in triples.pop():
+                    remaining[d] = True
+            triples.append(candidates[-1].pop())
+            for d in triples[-1]:
+                remaining[d] = False
+
+        shapes, labels = [], []
+        for x, y, z in triples:
+            e1, e2 = (x, y) if x + y == z else (2 * n - x, 2 * n - y)
+            shapes.append([((0, 0), (0, e1 % n), (0, (e1 + e2) % n)), ((0, 0), (0, e2 % n), (0, (e1 + e2) % n))])
+            labels.append((e1, e2))
+        return shapes, labels
+
+    def base_block(self, label, orientation, translation):
+        e1, e2 = label if orientation == 0 else label[::-1]
+        size = 2 * self.n
+        return [translation, (translation + e1) % size, (translation + e1 + e2) % size]
+
+    def develop(self, base_points):
+        return develop_rotational(self.order, base_points)
+
+
+class BicyclicSearch(CyclicSearch):
+    """
+    Bicyclic KTS: some pure differences of each half are split to triples {x, y, x + y} or {x, y, z}
+    with x + y + z = g (blocks within the half), mixed differences except one for each fixed point
+    are split to pairs {h, h + d}, one for each of the other pure differences d (blocks with two points
+    of one half and one point of the other half). Cells are points of both halves.
+    """
+
+    halves = 2
+
+    def __init__(self, order):
+        fixed = 1 if order % 12 == 3 else 3
+        super().__init__(order, (order - fixed) // 2, (order - fixed) // 2)
+        self.fixed = fixed
+
+    def pure_triples(self, count):
+        """
+        :return: list of count triples of random pure differences, None when there are not so many
+        """
+        g, rng = self.g, self.rng
+        remaining = {d for d in range(1, (g + 1) // 2) if 3 * d != g or self.fixed == 1}
+        triples = []
+        for _ in range(SHAPE_NODES):
+            if len(triples) == count:
+                return triples
+            if not self.count_node():
+                return None
+            z = rng.choice(sorted(remaining))
+            options = [(x, z - x, z) for x in range(1, (z + 1) // 2) if x in remaining and z - x in remaining]
+            options += [(x, g - z - x, z) for x in range(max(1, g - 2 * z + 1), (g - z + 1) // 2)
+                        if x in remaining and g - z - x in remaining]
+            if options:
+                triples.append(rng.choice(options))
+                remaining.difference_update(triples[-1])
+            elif rng.random() < 0.5:
+                # dead end, start again
+                remaining.update(d for triple in triples for d in triple)
+                triples = []
+        return None
+
+    def shapes(self):
+        g, rng = self.g, self.rng
+        count = (g - self.fixed) // 6
+        first = rng.randint(0, count)
+        pure = [self.pure_triples(first), self.pure_triples(count - first)]
+        if None in pure:
+            return None
+
+        # the other pure differences, each with its half, greatest first
+        differences = sorted(((d, half) for half in (0, 1) for d in range(1, (g + 1) // 2)
+                              if (3 * d != g or self.fixed == 1) and not any(d in triple for triple in pure[half])),
+                             reverse=True)
+        values = list(range(g))
+        rng.shuffle(values)
+        infinities, free = values[:self.fixed], [False] * g
+        for h in values[self.fixed:]:
+            free[h] = True
+
+        pairs, candidates, nodes = [], [], 0
+        while len(pairs) < len(differences):
+            nodes += 1
+            if nodes > SHAPE_NODES or not self.count_node():
+                return None
+            d = differences[len(pairs)][0]
+            options = [h for h in range(g) if free[h] and free[(h + d) % g]]
+            rng.shuffle(options)
+            candidates.append(options)
+            while not candidates[-1]:
+                candidates.pop()
+                if not candidates:
+                    return None
+                h = pairs.pop()
+                free[h] = free[(h + differences[len(pairs)][0]) % g] = True
+            d = differences[len(pairs)][0]
+            h = candidates[-1].pop()
+            pairs.append(h)
+            free[h] = free[(h + d) % g] = False
+
+        shapes, labels = [], []
+        for j, h in enumerate(infinities):
+            shapes.append([((0, 0), (1, h))])
+            labels.append(('fixed', j, h))
+        for half, triples in enumerate(pure):
+            for x, y, z in triples:
+                shapes.append([((half, 0), (half, x), (half, x + y)), ((half, 0), (half, y), (half, x + y))])
+                labels.append(('pure', half, (x, y)))
+        for (d, half), h in zip(differences, pairs):
+            # mixed differences of points (0, c), (0, c + d), (1, c + h + d) or (0, c), (1, c + h), (1, c + h + d)
+            shapes.append([((0, 0), (0, d), (1, h + d))] if half == 0 else [((0, 0), (1, h), (1, h + d))])
+            labels.append(('mixed', half, (h, d)))
+        return shapes, labels
+
+    def base_block(self, label, orientation, translation):
+        g, c = self.g, translation
+        kind, half, values = label
+        if kind == 'fixed':
+            return [2 * g + half, c, g + (c + values) % g]
+        if kind == 'pure':
+            x, y = values if orientation == 0 else values[::-1]
+            return [half * g + c, half * g + (c + x) % g, half * g + (c + x + y) % g]
+        h, d = values
+        if half == 0:
+            return [c, (c + d) % g, g + (c + h + d) % g]
+        return [c, g + (c + h) % g, g + (c + h + d) % g]
+
+    def develop(self, base_points):
+        return develop_bicyclic(self.order, base_points)
+
+
+def searcher(order):
+    """
+    :return: RotationalSearch of order = 3, 9 (mod 24), BicyclicSearch of other orders
+    """
+    return (RotationalSearch if order % 24 in (3, 9) else BicyclicSearch)(order)
+
+
+def init_worker(event):
+    global stop_event
+    stop_event = event
+
+
+def search_worker(order, seed, worker, workers, budget):
+    """
+    Worker running restarts seeded by (seed, worker + r * workers) for r = 0, 1, ...
+    :return: tuple (list of points of base blocks or None, nodes, restarts)
+    """
+    deadline = time.perf_counter() + budget
+    search = searcher(order)
+    seeds = ('%s/%s' % (seed, r) for r in range(worker, 1 << 62, workers))
+    return search.run(seeds, deadline), search.nodes, search.restarts
+
+
+def develop_rotational(order, base_points):
+    """
+    Develop base blocks of 1-rotational KTS, point x of Z_(order - 1) is x + 1 and infinity is order.
+    :param order: order of KTS
+    :param base_points: points of base blocks, three per block
+    :return: KTSSolution
+    """
+    n = (order - 1) // 2
+    size = 2 * n
+    base_class = [order - 1, 0, n]
+    for i in range(0, len(base_points), 3):
+        block = base_points[i:i + 3]
+        base_class += block + [(x + n) % size for x in block]
+
+    triples = array('I')
+    for day in range(n):
+        triples.extend(x + 1 if x == order - 1 else (x + day) % size + 1 for x in base_class)
+    return KTSSolution(order, triples)
+
+
+def develop_bicyclic(order, base_points):
+    """
+    Develop base day of bicyclic KTS, point (half, x) of Z_g x {0, 1} is half * g + x + 1
+    and fixed points are 2g + 1 .. order; the fixed day is the last one.
+    :param order: order of KTS
+    :param base_points: points of base day (half * g + x, or 2g + j for fixed points), three per block
+    :return: KTSSolution
+    """
+    g = (order - (1 if order % 12 == 3 else 3)) // 2
+    triples = array('I')
+    for day in range(g):
+        triples.extend(x + 1 if x >= 2 * g else x - x % g + (x + day) % g + 1 for x in base_points)
+    if order > 2 * g + 1:
+        triples.extend((2 * g + 1, 2 * g + 2, 2 * g + 3))
+        for half in (0, g):
+            for x in range(g // 3):
+                triples.extend((half + x + 1, half + x + g // 3 + 1, half + x + 2 * g // 3 + 1))
+    return KTSSolution(order, triples)
+
+
+def search(kts, processes=None, seed=None):
+    """
+    Find KTS of order to which no construction applies, within time budget kts.search.
+    Raise TimeoutError if time runs out.
+    :param kts: KTS instance
+    :param processes: run independent restarts in given number of worker processes
+    :param seed: seed of restarts, None for random one
+    :return: the first verified KTSSolution
+    """
+    order, budget = kts.order, kts.search
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    if processes is not None and processes > 1:
+        event = Event()
+        with ProcessPoolExecutor(processes, initializer=init_worker, initargs=(event,)) as executor:
+            futures = [executor.submit(search_worker, order, seed, worker, processes, budget)
+                       for worker in range(processes)]
+            found = None
+            for future in as_completed(futures):
+                solution = accept(kts, future.result(), found is None)
+                if found is None and solution is not None:
+                    found = solution
+                    event.set()
+    else:
+        found = accept(kts, search_worker(order, seed, 0, 1, budget))
+
+    if found is None:
+        raise TimeoutError('No KTS of order %s found by search in %s seconds' % (order, budget))
+    return found
+
+
+def accept(kts, result, check=True):
+    """
+    Count nodes and restarts of worker and verify its base blocks.
+    :param check: develop and verify base blocks, False to only count
+    :return: KTSSolution, None if worker did not succeed or its solution is not valid
+    """
+    base_points, nodes, restarts = result
+    kts.count('search_nodes', nodes)
+    kts.count('search_restarts', restarts)
+    if base_points is None or not check:
+        return None
+    solution = searcher(kts.order).develop(base_points)
+    try:
+        verify(solution)
+    except AssertionError:
+        return None
+    return solution
@@ -2,19 +2,297 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import cProfile
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+from cache import SolutionCache
+from instrument import Instrumentation
 from kts import KTS
+from writers import WRITERS
 
+COMMANDS = ('solve', 'day', 'point', 'variants', 'serve', 'bench')
 
-def parse_args():
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument('order', type=int)
-    return parser.parse_args()
+    parser.add_argument('--scan', type=int, metavar='N',
+                        help='list orders up to N with construction and q used, without solving them')
+    subparsers = parser.add_subparsers(dest='command')
+
+    solve = subparsers.add_parser('solve', help='solve KTS of given orders (default command)')
+    solve.add_argument('orders', nargs='+', type=parse_orders, metavar='order',
+                       help='order, or range of orders FIRST-LAST (only orders "order `mod` 6 = 3" of the range)')
+    solve.add_argument('--jobs', type=int, default=1, metavar='N',
+                       help='solve, verify and write N orders at once in worker processes')
+    solve.add_argument('--stream', action='store_true',
+                       help='print days one by one as they are generated, without solving whole KTS first')
+    solve.add_argument('--format', choices=sorted(WRITERS), default='text',
+                       help='output format (default text)')
+    solve.add_argument('--output', metavar='FILE',
+                       help='write output to FILE instead of standard output, '
+                            'for more orders FILE must contain "{order}", e.g. kts_{order}.txt')
+    solve.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                       help='load solution from (or store it to) cache directory, '
+                            'default $KTS_CACHE_DIR or ~/.cache/kts')
+    solve.add_argument('--vectorized', action='store_true', help='solve by NumPy engine (requires numpy)')
+    solve.add_argument('--solve-processes', type=int, metavar='N',
+                       help='develop single KTS by N worker processes into shared memory (requires numpy), '
+                            'or run restarts of local search in them')
+    solve.add_argument('--search', type=float, metavar='SECONDS',
+                       help='find KTS of orders no construction applies to by local search (1-rotational '
+                            'or bicyclic, see localsearch), giving up after SECONDS')
+    solve.add_argument('--verify-sample', type=int, metavar='DAYS',
+                       help='verify only given number of randomly chosen days')
+    solve.add_argument('--verify-processes', type=int, metavar='N',
+                       help='verify solution by N worker processes')
+    solve.add_argument('--shuffle', type=int, metavar='SEED',
+                       help='write isomorphic KTS with points and days shuffled randomly by SEED (requires numpy)')
+    solve.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                       help='print breakdown of phases and counters to standard error, '
+                            'dump cProfile statistics to FILE if given (for more orders FILE must contain "{order}")')
+
+    day = subparsers.add_parser('day', help='print one day of KTS without solving it')
+    day.add_argument('order', type=int)
+    day.add_argument('day', type=int, help='day number counted from 1')
+
+    point = subparsers.add_parser('point', help='print triples of one point for all days without solving KTS')
+    point.add_argument('order', type=int)
+    point.add_argument('point', type=int, help='point number counted from 1')
+
+    variants = subparsers.add_parser('variants', help='list KTS of one order for all primitive elements alpha, '
+                                                      'without isomorphic duplicates by fingerprint (requires numpy)')
+    variants.add_argument('order', type=int)
+    variants.add_argument('--processes', type=int, default=os.cpu_count(), metavar='N',
+                          help='solve variants by N worker processes (default number of CPUs)')
+    variants.add_argument('--all', action='store_true', help='list also variants with repeated fingerprint')
+
+    serve = subparsers.add_parser('serve', help='serve schedules over HTTP from memory, see server.py')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8000, help='port to listen on (default 8000)')
+    serve.add_argument('--unix', metavar='PATH', help='listen on Unix socket PATH instead of TCP')
+    serve.add_argument('--max-bytes', type=int, default=256 << 20, metavar='N',
+                       help='upper bound of memory of cached solutions (default 256 MiB)')
+    serve.add_argument('--processes', type=int, metavar='N',
+                       help='number of worker processes solving KTS (default number of CPUs)')
+    serve.add_argument('--vectorized', action='store_true', help='solve by NumPy engine')
+
+    # arguments of benchmark are parsed by kts_bench
+    subparsers.add_parser('bench', help='run benchmark suite, see "main.py bench --help"')
+
+    # solving is the default command, i.e. "main.py <order>"
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] not in COMMANDS + ('-h', '--help') and not argv[0].startswith('--scan'):
+        argv = ['solve'] + argv
+    return parser.parse_args(argv)
+
+
+def parse_orders(value):
+    """
+    :param value: order (e.g. '15') or range of orders (e.g. '27-999')
+    :return: list of orders
+    """
+    first, _, last = value.partition('-')
+    if not last:
+        return [int(first)]
+    first, last = int(first), int(last)
+    return list(range(first + (3 - first) % 6, last + 1, 6))
+
+
+def solve_order(order, args, stream=None):
+    """
+    Solve, verify and write KTS of one order, profiled if required (--profile).
+    :param order: order of KTS
+    :param args: parsed arguments of solve command
+    :param stream: output stream, None to return output (unless written to file)
+    :return: dictionary with order, method name or error, times of phases, output
+        and formatted breakdown of phases (profile) when profiled
+    """
+    if args.profile is None:
+        return run_order(order, args, stream)
+
+    instrumentation = Instrumentation()
+    if args.profile:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(run_order, order, args, stream, instrumentation)
+        profiler.dump_stats(args.profile.format(order=order))
+    else:
+        result = run_order(order, args, stream, instrumentation)
+    result['profile'] = instrumentation.format_report()
+    return result
+
+
+def run_order(order, args, stream=None, instrumentation=None):
+    """
+    See solve_order.
+    :param instrumentation: Instrumentation of KTS
+    """
+    result = {'order': order, 'method': None, 'error': None, 'output': None}
+    start = time.perf_counter()
+    try:
+        kts = KTS(order, instrumentation, search=args.search)
+    except ValueError as e:
+        result['error'] = str(e)
+        return result
+    result['method'] = kts.method_name
+
+    if args.stream:
+        days = enumerate(kts.iter_days(), 1)
+    else:
+        try:
+            days = kts.solve(cache=SolutionCache(args.cache or None) if args.cache is not None else None,
+                             vectorized=args.vectorized, processes=args.solve_processes)
+        except TimeoutError as e:
+            result['error'] = str(e)
+            return result
+        result['solve'] = time.perf_counter() - start
+        kts.test_classes(sample=args.verify_sample, processes=args.verify_processes)
+        result['verify'] = time.perf_counter() - start - result['solve']
+        if args.shuffle is not None:
+            days = kts.relabel(seed=args.shuffle, shuffle_days=True)
+
+    writer = WRITERS[args.format]
+    write_start = time.perf_counter()
+    with kts.phase('write'):
+        if args.output:
+            path = args.output.format(order=order)
+            with open(path, 'wb' if writer.binary else 'w', newline=None if writer.binary else '') as output:
+                writer(output).write(kts, days, heading=True)
+        elif stream is not None:
+            writer(stream).write(kts, days, heading=True)
+        else:
+            output = io.BytesIO() if writer.binary else io.StringIO()
+            writer(output).write(kts, days, heading=True)
+            result['output'] = output.getvalue()
+
+    result['write'] = time.perf_counter() - write_start
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+def solve_orders(orders, args):
+    """
+    Solve orders one by one, or by worker processes (--jobs), print summary of times
+    to standard error when there are more orders.
+    :return: exit status, 1 if some orders were not solved
+    """
+    writer = WRITERS[args.format]
+    stdout = sys.stdout.buffer if writer.binary else sys.stdout
+    if len(orders) > 1 and args.output and '{order}' not in args.output:
+        sys.exit('Output file name must contain "{order}" for more orders')
+    if args.stream and args.shuffle is not None:
+        sys.exit('Solution streamed by days cannot be shuffled')
+    if len(orders) > 1 and args.profile and '{order}' not in args.profile:
+        sys.exit('Profile file name must contain "{order}" for more orders')
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(args.jobs) as executor:
+            futures = [executor.submit(solve_order, order, args) for order in orders]
+            results = []
+            for future in futures:
+                results.append(future.result())
+                if results[-1]['output'] is not None:
+                    stdout.write(results[-1]['output'])
+    else:
+        results = [solve_order(order, args, stdout) for order in orders]
+
+    if len(orders) == 1 and results[0]['error']:
+        print(results[0]['error'], file=sys.stderr)
+    elif len(orders) > 1:
+        print_summary(results)
+    for result in results:
+        if result.get('profile'):
+            print('Profile of order %s\n%s' % (result['order'], result['profile']), file=sys.stderr)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+def print_summary(results):
+    print('%8s  %-16s  %9s  %9s  %9s  %9s' % ('order', 'method', 'solve', 'verify', 'write', 'total'), file=sys.stderr)
+    for result in results:
+        if result['error']:
+            print('%8s  skipped: %s' % (result['order'], result['error']), file=sys.stderr)
+        else:
+            print('%8s  %-16s  %9s  %9s  %9.3f  %9.3f' % (
+                result['order'], result['method'],
+                '%.3f' % result['solve'] if 'solve' in result else '-',
+                '%.3f' % result['verify'] if 'verify' in result else '-',
+                result['write'], result['total']), file=sys.stderr)
+
+
+def print_variants(order, processes, unique):
+    for variant in KTS(order).variants(processes, unique):
+        if variant['valid']:
+            print('alpha = %s, m = %s, Pasch configurations: %s, fingerprint: %s' % (
+                variant['alpha'], variant['m'], variant['pasch'], variant['fingerprint']), flush=True)
+        else:
+            print('alpha = %s, m = %s, invalid: %s' % (variant['alpha'], variant['m'], variant['error']), flush=True)
+
+
+def print_day(order, day):
+    """
+    Print one day of KTS without solving it.
+    :param day: day number counted from one
+    :return: exit status, 1 if the day cannot be printed
+    """
+    try:
+        kts = KTS(order)
+        if not 1 <= day <= kts.num_days:
+            raise IndexError('Day %s out of range 1 .. %s' % (day, kts.num_days))
+        triples = kts.get_day(day - 1)
+    except (ValueError, IndexError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    kts.print_days([(day, triples)])
+    return 0
+
+
+def print_point(order, point):
+    """
+    Print triples of one point for all days without solving KTS.
+    :param point: point number counted from one
+    :return: exit status, 1 if the point cannot be printed
+    """
+    try:
+        kts = KTS(order)
+        schedule = kts.point_schedule(point)
+    except (ValueError, IndexError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    kts.print_days((day, [block_triple]) for day, block_triple in enumerate(schedule, 1))
+    return 0
+
+
+def print_scan(limit):
+    lines = ('%8s: %s, q = %s\n' % (order, method_name, q) if method_name else '%8s: Not possible to solve\n' % order
+             for order, method_name, q in KTS.feasible_orders(limit))
+    sys.stdout.writelines(lines)
 
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['bench']:
+        import kts_bench
+        sys.exit(kts_bench.main(sys.argv[2:]))
+
     args = parse_args()
-    kts = KTS(args.order)
-    kts.solve()
-    kts.test_classes()
-    kts.print_solution(print_heading=True)
+    if args.scan is not None:
+        print_scan(args.scan)
+        sys.exit()
+
+    if args.command == 'serve':
+        import asyncio
+        import server
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix, args.max_bytes, args.processes, args.vectorized))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'variants':
+        print_variants(args.order, args.processes, not args.all)
+    elif args.command == 'day':
+        sys.exit(print_day(args.order, args.day))
+    elif args.command == 'point':
+        sys.exit(print_point(args.order, args.point))
+    else:
+        sys.exit(solve_orders([order for orders in args.orders for order in orders], args))
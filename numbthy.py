@@ -20,6 +20,8 @@
 		factor(n) - Return a sorted list of the prime factors of n with exponents.
 		prime_divisors(n) - Returns a sorted list of the prime divisors of n.
 		is_primitive_root(g,n) - Test whether g is primitive - generates the group of units mod n.
+		find_primitive_root(n,greatest=False) - Find the least (or the greatest) primitive root mod n.
+		prime_power_sieve(n) - Flags of prime powers less than n.
 		sqrtmod(a,n) - Compute sqrt(a) mod n using various algorithms.
 		TSRsqrtmod(a,grpord,n) - Compute sqrt(a) mod n using Tonelli-Shanks-RESSOL algorithm.
 	Usage and help for the module is printed with the command help(numbthy) and a list of functions in the module with the command dir(numbthy).
@@ -27,6 +29,7 @@
 		is_prime(n) - Test whether n is prime using a variety of pseudoprime tests. (Renamed is_prime(b,n) in ver 0.7)
 		isprimeF(n,b) - Test whether n is prime or a Fermat pseudoprime to base b.
 		isprimeE(n,b) - Test whether n is prime or an Euler pseudoprime to base b.
+		isprimeMR(n,b) - Test whether n is prime or a strong (Miller-Rabin) pseudoprime to base b.
 		factorone(n) - Find a factor of n using a variety of methods.
 		factors(n) - Return a sorted list of the prime factors of n. (Prior to ver 0.7 named factor(n))
 		factorPR(n) - Find a factor of n using the Pollard Rho method.
@@ -45,9 +48,7 @@ import functools # Use reduce (Python 2.5+ and 3.x)
 
 def gcd(a,b):
 	"""gcd(a,b) returns the greatest common divisor of the integers a and b."""
-	if a == 0:
-		return abs(b)
-	return abs(gcd(b % a, a))
+	return math.gcd(a,b) # Iterative, in C (Python 3.5+)
 
 def xgcd(a,b):
 	"""xgcd(a,b) returns a tuple of form (g,x,y), where g is gcd(a,b) and
@@ -91,14 +92,24 @@ def inverse_mod(a,n):
 	return xa % n
 
 def is_prime(n):
-	"""is_prime(n) - Test whether n is prime using a variety of pseudoprime tests."""
+	"""is_prime(n) - Test whether n is prime using strong pseudoprime (Miller-Rabin) tests.
+	Deterministic for n < 3.3*10^24 (i.e. all 64-bit inputs), probabilistic above."""
 	if n<0: n=-n  # Only deal with positive integers
 	if n<2: return False # 0 and 1 are not prime
-	if (n in (2,3,5,7,11,13,17,19,23,29)): return True
-	return isprimeE(n,2) and isprimeE(n,3) and isprimeE(n,5)
+	for p in MR_BASES:
+		if n % p == 0: return n == p
+	return all(isprimeMR(n,b) for b in MR_BASES)
 
+# First 12 primes are a deterministic set of Miller-Rabin bases for n < 3317044064679887385961981
+MR_BASES = (2,3,5,7,11,13,17,19,23,29,31,37)
+
+# Bound of number of memoized factorizations
+FACTOR_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=FACTOR_CACHE_SIZE)
 def factor(n):
-	"""factor(n) - Return a sorted list of the prime factors of n with exponents."""
+	"""factor(n) - Return a sorted list of the prime factors of n with exponents.
+	Factorizations are memoized (LRU bounded by FACTOR_CACHE_SIZE)."""
 	# Rewritten to align with SAGE.  Previous semantics available as factors(n).
 	if (abs(n) == 1): return "Unable to factor "+str(n) # Can't deal with units
 	factspow = []
@@ -116,7 +127,7 @@ def factor(n):
 
 def prime_divisors(n):
 	"""prime_divisors(n) - Returns a sorted list of the prime divisors of n."""
-	return tuple(set(factors(n)))
+	return tuple(p for (p,e) in factor(n))
 
 def euler_phi(n):
 	"""euler_phi(n) - Computer Euler's Phi function of n - the number of integers
@@ -153,6 +164,33 @@ def is_primitive_root(g,n):
 		if pow(g,order//fact,n) == 1: return False
 	return True
 
+def find_primitive_root(n,greatest=False):
+	"""find_primitive_root(n,greatest=False) - Find the least (or the greatest) primitive root mod n,
+	None if the group of units mod n isn't cyclic. Factors phi(n) only once for all candidates."""
+	if n in (1,2): return n-1
+	order = euler_phi(n)
+	if carmichael_lambda(n) != order: return None # Group of units isn't cyclic
+	exponents = tuple(order//fact for fact in prime_divisors(order))
+	for g in (range(n-1,1,-1) if greatest else range(2,n)):
+		if gcd(g,n) == 1 and all(pow(g,e,n) != 1 for e in exponents):
+			return g
+
+def prime_power_sieve(n):
+	"""prime_power_sieve(n) - Return bytearray of length n, with 1 at prime powers p**e (e >= 1) and 0 elsewhere.
+	Uses sieve of Eratosthenes, one byte per number."""
+	flags = bytearray([1])*n
+	flags[:2] = bytearray(min(n,2))
+	for p in range(2,math.isqrt(max(n-1,0))+1):
+		if flags[p]:
+			flags[p*p::p] = bytearray(len(range(p*p,n,p)))
+	powers = bytearray(n)
+	for p in (i for i in range(2,n) if flags[i]):
+		power = p
+		while power < n:
+			powers[power] = 1
+			power *= p
+	return powers
+
 def sqrtmod(a,n):
 	"""sqrtmod(a,n) - Compute sqrt(a) mod n using various algorithms.
 	Currently n must be prime, but will be extended to general n (when I get the time)."""
@@ -203,6 +241,18 @@ def isprimeE(n,b):
 		if (c == n-1): return True
 		c = pow(c,2,n)
 
+def isprimeMR(n,b):
+	"""isprimeMR(n) - Test whether n is prime or a strong (Miller-Rabin) pseudoprime to base b."""
+	d = n-1; s = 0
+	while (d % 2 == 0):
+		d //= 2; s += 1
+	x = pow(b,d,n)
+	if (x == 1 or x == n-1): return True
+	for i in range(s-1):
+		x = pow(x,2,n)
+		if (x == n-1): return True
+	return False
+
 def factorone(n):
 	"""factorone(n) - Find a prime factor of n using a variety of methods."""
 	if (is_prime(n)): return n
@@ -222,23 +272,21 @@ def factors(n):
 	return facts
 
 def factorPR(n):
-	"""factorPR(n) - Find a factor of n using the Pollard Rho method.
-	Note: This method will occasionally fail."""
-	numsteps=2*math.floor(math.sqrt(math.sqrt(n)))
-	for additive in range(1,5):
-		fast=slow=1; i=1
-		while i<numsteps:
-			slow = (slow*slow + additive) % n
-			i = i + 1
-			fast = (fast*fast + additive) % n
-			fast = (fast*fast + additive) % n
-			g = gcd(fast-slow,n)
-			if (g != 1):
-				if (g == n):
-					break
-				else:
-					return g
-	return 1
+	"""factorPR(n) - Find a nontrivial factor of composite n using the Pollard Rho method (Brent's variant).
+	Retries with other additive constants until a factor is found."""
+	if n % 2 == 0: return 2
+	additive = 0
+	while True:
+		additive += 1
+		fast = 2; g = 1; steps = 1
+		while g == 1:
+			slow = fast
+			for i in range(steps):
+				fast = (fast*fast + additive) % n
+				g = gcd(fast-slow,n)
+				if (g != 1): break
+			steps *= 2
+		if g != n: return g
 
 ################ Functions renamed in ver 0.7 (to align with SAGE) #################
 def powmod(b,e,n):
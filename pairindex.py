@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index of KTS pairs: every pair of points meets exactly once, so the day and block
+of their meeting are stored in triangular array of order * (order - 1) / 2 slots.
+"""
+
+import math
+
+import numpy as np
+
+# number of set bits of each byte value, vectorized popcount is lookup into it
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+def pair_offsets(x, y):
+    """
+    Position of pairs of points in triangular array.
+    :param x: point or array of points counted from one
+    :param y: point or array of points counted from one, different from x
+    :return: position or array of positions
+    """
+    low, high = np.minimum(x, y).astype(np.int64) - 1, np.maximum(x, y).astype(np.int64) - 1
+    return high * (high - 1) // 2 + low
+
+
+def pair_rows(order, dtype=np.int64):
+    """
+    Offsets of rows of triangular array, pair_offsets(x, y) is rows[max(x, y)] + min(x, y)
+    without conversion and multiplication of the points.
+    :param order: the greatest point
+    :param dtype: integer type of offsets, with np.uint32 the offsets are modulo 2^32 (rows[2] is -1)
+    :return: array of order + 1 offsets
+    """
+    points = np.arange(order + 1, dtype=np.int64)
+    return ((points - 1) * (points - 2) // 2 - 1).astype(dtype)
+
+
+def met_bits(bits, offsets):
+    """
+    :param bits: bitset of pairs, bit offset & 7 of byte offset >> 3 for pair at given offset
+    :return: array of bits (0 or 1) of given pairs
+    """
+    return (bits[offsets >> 3] >> (offsets & 7).astype(np.uint8)) & 1
+
+
+def offset_pair(offset):
+    """
+    Pair of points at given position of triangular array, inverse of pair_offsets.
+    :param offset: position
+    :return: tuple (x, y) of points counted from one, x < y
+    """
+    high = (1 + math.isqrt(1 + 8 * offset)) // 2
+    return offset - high * (high - 1) // 2 + 1, high + 1
+
+
+class PairIndex:
+    """
+    Maps each pair of points to slot 'day * blocks per day + block' of the solution.
+    """
+
+    def __init__(self, solution):
+        """
+        Build index by one vectorized pass over the solution.
+        :param solution: KTSSolution
+        """
+        self.order = solution.order
+        self.blocks_per_day = solution.blocks_per_day
+        self.slots = np.full(self.order * (self.order - 1) // 2, -1, dtype=np.int32)
+
+        triples = solution.array().reshape(-1, 3)
+        slots = np.arange(len(triples), dtype=np.int32)
+        for i, j in ((0, 1), (0, 2), (1, 2)):
+            self.slots[pair_offsets(triples[:, i], triples[:, j])] = slots
+
+    def meeting(self, x, y):
+        """
+        :param x: point counted from one
+        :param y: point counted from one
+        :return: tuple (day, block) both counted from zero
+        """
+        if x == y or not (1 <= x <= self.order and 1 <= y <= self.order):
+            raise ValueError('Points %s and %s are not a pair of points of KTS order %s' % (x, y, self.order))
+        return divmod(int(self.slots[pair_offsets(x, y)]), self.blocks_per_day)
+
+    def meetings(self, x, y):
+        """
+        Bulk query of pairs.
+        :param x: array of points counted from one
+        :param y: array of points counted from one
+        :return: tuple (array of days, array of blocks) both counted from zero
+        """
+        x, y = np.asarray(x), np.asarray(y)
+        if np.any(x == y) or np.any(np.minimum(x, y) < 1) or np.any(np.maximum(x, y) > self.order):
+            raise ValueError('Some of points are not pairs of points of KTS order %s' % self.order)
+        return np.divmod(self.slots[pair_offsets(x, y)], self.blocks_per_day)
+
+    @property
+    def nbytes(self):
+        return self.slots.nbytes
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parallel development of a single large KTS. Worker processes fill disjoint ranges of days
+(including remainder classes of Construction 1.2) directly into one shared memory array,
+which backs the returned solution without copy.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine import develop_days
+
+# number of ranges of days per worker process, balances uneven speed of workers
+RANGES_PER_PROCESS = 4
+
+
+def develop_shared(order, alpha, name, first, last):
+    """
+    Worker developing range of days into shared memory.
+    :param order: order of KTS
+    :param alpha: primitive element used by KTS
+    :param name: name of shared memory block holding array of shape (days, order / 3, 3)
+    :param first: the first day counted from zero
+    :param last: the day after the last one
+    """
+    from kts import KTS
+    kts = KTS(order, alpha=alpha)
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        solution = np.ndarray((kts.num_days, order // 3, 3), dtype=np.int32, buffer=memory.buf)
+        develop_days(kts, first, last, solution[first:last])
+        del solution
+    finally:
+        memory.close()
+
+
+class SharedPoints:
+    """
+    Shared memory block of developed points, unlinked when the last array viewing it is released.
+    Arrays are created from __array_interface__, so they keep this object as their base.
+    """
+
+    def __init__(self, memory, shape):
+        self.memory = memory
+        self.__array_interface__ = np.ndarray(shape, dtype=np.int32, buffer=memory.buf).__array_interface__
+
+    def __del__(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def develop_parallel(kts, processes):
+    """
+    Obtain all parallel classes of KTS by worker processes.
+    :param kts: KTS instance
+    :param processes: number of worker processes
+    :return: int32 array of shape (days, order / 3, 3) backed by shared memory (no copy), see SharedPoints
+    """
+    shape = (kts.num_days, kts.order // 3, 3)
+    memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 4)
+    try:
+        bounds = np.linspace(0, kts.num_days, processes * RANGES_PER_PROCESS + 1).astype(int)
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(develop_shared, kts.order, kts.alpha, memory.name, first, last)
+                       for first, last in zip(bounds[:-1], bounds[1:]) if first < last]
+            for future in futures:
+                future.result()
+    except BaseException:
+        memory.close()
+        memory.unlink()
+        raise
+    return np.asarray(SharedPoints(memory, shape))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Relabeling of solved KTS. Any permutation of points, and of days, maps KTS onto isomorphic KTS,
+so schedules of other participant lists or distinct-looking schedules of the same order cost
+a single gather over the array of triples instead of new construction.
+"""
+
+import numpy as np
+
+from solution import KTSSolution
+
+# number of points converted to participants at once, bounds memory of temporary arrays
+CHUNK_POINTS = 1 << 20
+
+
+def relabel(solution, permutation=None, seed=None, shuffle_days=False):
+    """
+    Map solution onto isomorphic one.
+    :param solution: KTSSolution (e.g. loaded from cache)
+    :param permutation: sequence of new points, point x is replaced by permutation[x - 1];
+        random permutation when None
+    :param seed: seed of random permutation of points and of days
+    :param shuffle_days: put days to random order too
+    :return: new KTSSolution
+    """
+    order, days = solution.order, solution.array()
+    rng = np.random.default_rng(seed)
+    if permutation is None:
+        permutation = rng.permutation(order) + 1
+    permutation = np.asarray(permutation)
+    if permutation.shape != (order,) or not np.array_equal(np.sort(permutation), np.arange(1, order + 1)):
+        raise ValueError('Permutation must contain each point 1 .. %s exactly once' % order)
+
+    # point x --> table[x], index 0 is unused as points are counted from one
+    table = np.zeros(order + 1, dtype=days.dtype)
+    table[1:] = permutation
+
+    if shuffle_days:
+        days = days[rng.permutation(len(days))]
+    return KTSSolution(order, np.take(table, days))
+
+
+def roster_days(solution, roster):
+    """
+    Schedule of given participants, point x is participant roster[x - 1].
+    :param solution: KTSSolution
+    :param roster: sequence of order participants (names, IDs, ...)
+    :return: iterator of lists of triples of participants, one list for each day
+    """
+    if len(roster) != solution.order:
+        raise ValueError('Roster has %s participants instead of %s' % (len(roster), solution.order))
+    labels = np.empty(solution.order + 1, dtype=object)
+    labels[1:] = list(roster)
+
+    days = solution.array()
+    step = max(1, CHUNK_POINTS // solution.order)
+    for start in range(0, len(days), step):
+        for day in labels[days[start:start + step]].tolist():
+            yield list(map(tuple, day))
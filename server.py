@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Long-running schedule server (asyncio), speaking minimal HTTP/1.1 on localhost TCP or Unix socket.
+Solved KTS are kept in memory (least recently used are evicted beyond byte limit), concurrent
+requests for the same unsolved order wait for single solve, which runs in worker process.
+
+    GET /kts/<order>[?format=text|csv|jsonl|bin]   whole schedule, see writers
+    GET /kts/<order>/day/<day>                     JSON triples of one day (counted from 1)
+    GET /kts/<order>/point/<point>                 JSON triples of one point for all days
+    GET /stats                                     JSON counters of requests, solves and cache
+
+    python3 main.py serve --port 8000
+    curl localhost:8000/kts/99/day/1
+"""
+
+import asyncio
+import io
+import json
+import multiprocessing
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from kts import KTS
+from solution import KTSSolution
+from writers import WRITERS
+
+DEFAULT_MAX_BYTES = 256 << 20
+
+CONTENT_TYPES = {
+    'text': 'text/plain; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+    'bin': 'application/octet-stream',
+}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SolutionLRU:
+    """
+    Solutions by order, bounded by total size of their points.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.solutions = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, order):
+        """
+        :return: KTSSolution marked as the most recently used, None when not cached
+        """
+        solution = self.solutions.get(order)
+        if solution is not None:
+            self.solutions.move_to_end(order)
+        return solution
+
+    def put(self, order, solution):
+        """
+        Cache solution, evict the least recently used ones beyond max_bytes.
+        Solution greater than max_bytes is not cached.
+        """
+        if solution.nbytes > self.max_bytes:
+            return
+        previous = self.solutions.pop(order, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+        self.solutions[order] = solution
+        self.nbytes += solution.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.solutions.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+def solve_points(order, vectorized=False):
+    """
+    Worker solving KTS.
+    :return: tuple (array typecode, bytes of points)
+    """
+    solution = KTS(order).solve(vectorized=vectorized)
+    return solution.points.format, solution.points.tobytes()
+
+
+class ScheduleServer:
+    """
+    Request handler with cache of solutions, solves are coalesced by order and run in process pool.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, processes=None, vectorized=False):
+        """
+        :param max_bytes: upper bound of memory of cached solutions
+        :param processes: number of worker processes solving KTS (default number of CPUs)
+        :param vectorized: solve by NumPy engine
+        """
+        self.cache = SolutionLRU(max_bytes)
+        # forked worker would inherit sockets of connections open at the time, so their closing
+        # would never reach clients; workers of forkserver start from clean process
+        self.executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('forkserver'))
+        self.vectorized = vectorized
+        self.pending = {}
+        self.stats = {'requests': 0, 'errors': 0, 'hits': 0, 'solves': 0, 'coalesced': 0}
+
+    async def solution(self, order):
+        """
+        Cached solution, or result of solve shared by all concurrent requests of the order.
+        :return: KTSSolution
+        """
+        solution = self.cache.get(order)
+        if solution is not None:
+            self.stats['hits'] += 1
+            return solution
+
+        task = self.pending.get(order)
+        if task is None:
+            task = self.pending[order] = asyncio.ensure_future(self.solve(order))
+            task.add_done_callback(lambda _: self.pending.pop(order, None))
+        else:
+            self.stats['coalesced'] += 1
+        # client closing connection must not cancel solve awaited by other clients
+        return await asyncio.shield(task)
+
+    async def solve(self, order):
+        self.stats['solves'] += 1
+        typecode, data = await asyncio.get_running_loop().run_in_executor(
+            self.executor, solve_points, order, self.vectorized)
+        points = array(typecode)
+        points.frombytes(data)
+        solution = KTSSolution(order, points)
+        self.cache.put(order, solution)
+        return solution
+
+    async def handle(self, reader, writer):
+        """
+        Serve one request per connection.
+        """
+        self.stats['requests'] += 1
+        request_line = []
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()).strip():
+                pass
+            if len(request_line) != 3:
+                raise HTTPError(400, 'Malformed request line')
+            if request_line[0] not in ('GET', 'HEAD'):
+                raise HTTPError(405, 'Only GET is supported')
+            status, content_type, body = 200, *await self.respond(request_line[1])
+        except HTTPError as e:
+            status, content_type, body = e.status, 'text/plain; charset=utf-8', ('%s\n' % e).encode('utf-8')
+        except Exception as e:
+            status, content_type, body = 500, 'text/plain; charset=utf-8', ('%s\n' % e).encode('utf-8')
+        if status != 200:
+            self.stats['errors'] += 1
+
+        head = 'HTTP/1.1 %s %s\r\nContent-Type: %s\r\nContent-Length: %s\r\nConnection: close\r\n\r\n' % (
+            status, REASONS[status], content_type, len(body))
+        try:
+            writer.write(head.encode('latin-1'))
+            if request_line[:1] != ['HEAD']:
+                writer.write(body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, target):
+        """
+        :param target: request target, e.g. '/kts/15/day/1'
+        :return: tuple (content type, body)
+        """
+        url = urlsplit(target)
+        path = [part for part in url.path.split('/') if part]
+        if path == ['stats']:
+            stats = dict(self.stats, cached_orders=list(self.cache.solutions), cached_bytes=self.cache.nbytes)
+            return 'application/json', json.dumps(stats).encode('utf-8')
+        if len(path) not in (2, 4) or path[0] != 'kts' or len(path) == 4 and path[2] not in ('day', 'point'):
+            raise HTTPError(404, 'Unknown path %s' % url.path)
+
+        try:
+            numbers = [int(part) for part in path[1::2]]
+            kts = KTS(numbers[0])
+        except ValueError as e:
+            raise HTTPError(400, e)
+
+        if len(path) == 2:
+            output_format = parse_qs(url.query).get('format', ['text'])[-1]
+            if output_format not in WRITERS:
+                raise HTTPError(400, 'Unknown format %s, use one of %s' % (output_format, ', '.join(sorted(WRITERS))))
+            solution = await self.solution(kts.order)
+            body = await asyncio.get_running_loop().run_in_executor(None, format_solution, kts, solution, output_format)
+            return CONTENT_TYPES[output_format], body
+
+        # single day (from cached solution if there is one) and point schedule need no solve
+        if path[2] == 'day' and not 1 <= numbers[1] <= kts.num_days:
+            raise HTTPError(400, 'Day %s out of range 1 .. %s' % (numbers[1], kts.num_days))
+        try:
+            if path[2] == 'day':
+                solution = self.cache.get(kts.order)
+                triples = solution.day(numbers[1] - 1) if solution is not None else kts.get_day(numbers[1] - 1)
+            else:
+                triples = kts.point_schedule(numbers[1])
+        except (IndexError, ValueError) as e:
+            raise HTTPError(400, e)
+        return 'application/json', json.dumps({'order': kts.order, path[2]: numbers[1], 'triples': triples}).encode()
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def format_solution(kts, solution, output_format):
+    """
+    :return: bytes of solution written by writer of given format
+    """
+    writer = WRITERS[output_format]
+    output = io.BytesIO() if writer.binary else io.StringIO(newline='')
+    writer(output).write(kts, solution, heading=True)
+    return output.getvalue() if writer.binary else output.getvalue().encode('utf-8')
+
+
+async def serve(host='127.0.0.1', port=8000, unix=None, max_bytes=DEFAULT_MAX_BYTES, processes=None,
+                vectorized=False):
+    """
+    Run server until cancelled.
+    :param host: address of TCP socket
+    :param port: port of TCP socket
+    :param unix: path of Unix socket used instead of TCP
+    """
+    handler = ScheduleServer(max_bytes, processes, vectorized)
+    if unix:
+        server = await asyncio.start_unix_server(handler.handle, path=unix)
+    else:
+        server = await asyncio.start_server(handler.handle, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        handler.close()
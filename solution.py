@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+class KTSSolution:
+    """
+    Solution of Kirkman Triple System stored as flat buffer of points (three per block,
+    order / 3 blocks per day) instead of dictionaries of tuples.
+    """
+
+    __slots__ = ('order', 'num_days', 'blocks_per_day', 'buffer', 'points')
+
+    def __init__(self, order, buffer):
+        """
+        :param order: order of KTS
+        :param buffer: C-contiguous buffer of integer points day by day, e.g. array('I')
+            or NumPy array of shape (days, order / 3, 3); it is not copied
+        """
+        view = memoryview(buffer)
+        self.order = order
+        self.buffer = buffer
+        self.points = view.cast('B').cast(view.format)
+        self.blocks_per_day = order // 3
+        self.num_days = len(self.points) // order
+
+    def day(self, d):
+        """
+        Blocks of one day.
+        :param d: day number counted from zero
+        :return: list of point triples
+        """
+        if not 0 <= d < self.num_days:
+            raise IndexError('Day %s out of range of %s days' % (d, self.num_days))
+        points = self.points[d * self.order:(d + 1) * self.order].tolist()
+        return list(zip(points[0::3], points[1::3], points[2::3]))
+
+    def __getitem__(self, day):
+        """
+        Blocks of one day, compatible with dictionary of days returned by solve() formerly.
+        Raise KeyError if there is no such day.
+        :param day: day number counted from one
+        :return: list of point triples
+        """
+        if not 1 <= day <= self.num_days:
+            raise KeyError(day)
+        return self.day(day - 1)
+
+    def keys(self):
+        """
+        :return: day numbers counted from one, see items
+        """
+        return range(1, self.num_days + 1)
+
+    def values(self):
+        """
+        :return: iterator of lists of point triples, see items
+        """
+        return iter(self)
+
+    def items(self):
+        """
+        Tuple view compatible with dictionary of days returned by solve() formerly.
+        :return: iterator of (day number counted from one, list of point triples)
+        """
+        for d in range(self.num_days):
+            yield d + 1, self.day(d)
+
+    def array(self):
+        """
+        NumPy view of the solution (no copy).
+        :return: array of shape (days, order / 3, 3)
+        """
+        import numpy as np
+        return np.frombuffer(self.points, dtype=self.points.format).reshape(self.num_days, self.blocks_per_day, 3)
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes
+
+    def __iter__(self):
+        for d in range(self.num_days):
+            yield self.day(d)
+
+    def __len__(self):
+        return self.num_days
+
+    def __repr__(self):
+        return 'KTSSolution(order=%s, days=%s)' % (self.order, self.num_days)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Legacy create_parallel() of Construction 1.2 for orders with t = (q - 1) / 6 >= 2,
+whose remainder triples were once split to wrong classes.
+
+    python3 -m pytest -q test_kts.py
+"""
+
+import pytest
+
+from kts import KTS
+from verify import check_coverage, check_days, check_pairs, check_triples
+
+# order (q): 57 (19), 93 (31), 129 (43), 237 (79), 507 (169 = 13^2)
+ORDERS = [57, 93, 129, 237, 507]
+
+
+def legacy_classes(order):
+    kts = KTS(order)
+    assert kts.method_name == 'Construction 1.2' and kts.t >= 2
+    kts.create_parallel()
+    return kts.classes
+
+
+@pytest.mark.parametrize('order', ORDERS)
+def test_create_parallel(order):
+    np = pytest.importorskip('numpy')
+    days = np.array([list(blocks.values()) for blocks in legacy_classes(order).values()])
+    assert days.shape == ((order - 1) // 2, order // 3, 3)
+    check_days(days)
+    check_coverage(check_pairs(days), order)
+
+
+@pytest.mark.parametrize('order', ORDERS[:2])
+def test_create_parallel_pure_python(order):
+    classes = legacy_classes(order)
+    check_triples(order, enumerate((list(blocks.values()) for blocks in classes.values()), 1))
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Planning of a series of KTS events with overlapping participants, so that people who already met
+meet again as rarely as possible. MeetingTracker keeps pairs of participants who met in packed bitset
+(one bit per pair, see pairindex.pair_offsets), optimize searches relabeling of the next schedule
+onto its roster with the least already met pairs.
+
+Every KTS covers every pair of its points, so a whole KTS event meets all pairs of its roster
+whatever the labeling is. Relabeling matters when the event takes only some days of the schedule:
+the days with the least already met pairs are chosen, and days share no pairs, so the score
+of a labeling is the sum of its smallest numbers of met pairs per day.
+
+    tracker = MeetingTracker(participants=60)
+    for roster in events:
+        kts = KTS(len(roster))
+        permutation, days, overlap = kts.least_overlap(tracker, roster, days=3)
+        tracker.add(kts.relabel(permutation), roster, days)
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pairindex import POPCOUNT, met_bits, pair_offsets
+
+# swaps of two points scored at once in one step of optimization
+BATCH = 64
+
+# the most met pairs of one day a swap changes (two partners of each of the swapped points)
+MAX_CHANGE = 4
+
+# state of optimization shared by restarts of one process, see init_optimizer
+optimizer = None
+
+
+class MeetingTracker:
+    """
+    Pairs of participants (numbered from one) who already met, in bitset of participants * (participants - 1) / 2 bits.
+    """
+
+    def __init__(self, participants):
+        """
+        :param participants: number of all participants of the series
+        """
+        self.participants = participants
+        self.bits = np.zeros((participants * (participants - 1) // 2 + 7) // 8, dtype=np.uint8)
+
+    def labels(self, order, roster=None):
+        """
+        :param order: order of KTS
+        :param roster: sequence of order participants, point x is participant roster[x - 1]; None when points
+            are the participants
+        :return: array of participants of points, index 0 is unused
+        """
+        roster = np.arange(1, order + 1) if roster is None else np.asarray(roster)
+        if roster.shape != (order,) or len(np.unique(roster)) != order or \
+                roster.min() < 1 or roster.max() > self.participants:
+            raise ValueError('Roster must contain %s different participants 1 .. %s' % (order, self.participants))
+        labels = np.zeros(order + 1, dtype=np.int64)
+        labels[1:] = roster
+        return labels
+
+    def add(self, solution, roster=None, days=None):
+        """
+        Record meetings of an event.
+        :param solution: KTSSolution of the event
+        :param roster: participants of points, see labels
+        :param days: numbers of days (counted from zero) which took place, None for all
+        """
+        triples = self.labels(solution.order, roster)[solution.array() if days is None else solution.array()[days]]
+        triples = triples.reshape(-1, 3)
+        for i, j in ((0, 1), (0, 2), (1, 2)):
+            offsets = pair_offsets(triples[:, i], triples[:, j])
+            np.bitwise_or.at(self.bits, offsets >> 3, (1 << (offsets & 7)).astype(np.uint8))
+
+    def met(self, x, y):
+        """
+        :param x: participant or array of participants
+        :param y: participant or array of participants, different from x
+        :return: whether (or array of whether) they already met
+        """
+        return met_bits(self.bits, pair_offsets(x, y)).astype(bool)
+
+    def overlap(self, solution, roster=None):
+        """
+        :return: array of numbers of already met pairs in each day of solution
+        """
+        return day_overlaps(self.bits, self.labels(solution.order, roster), solution.array())
+
+    def count(self):
+        """
+        :return: number of pairs of participants who already met
+        """
+        return int(POPCOUNT[self.bits].sum(dtype=np.int64))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+
+def day_overlaps(bits, labels, days):
+    """
+    :param bits: bitset of met pairs
+    :param labels: array of participants of points
+    :param days: array of shape (days, blocks, 3)
+    :return: array of numbers of met pairs in each day
+    """
+    triples = labels[days]
+    return sum(met_bits(bits, pair_offsets(triples[..., i], triples[..., j])).sum(axis=1, dtype=np.int64)
+               for i, j in ((0, 1), (0, 2), (1, 2)))
+
+
+class Optimizer:
+    """
+    Hill climbing over permutations of points of one schedule, by batches of swaps of two points.
+    Numbers of already met partners of each point on each day are kept along, so a swap only
+    looks up the pairs it creates and only the swapped points and their partners are updated.
+    Swaps are scored on window of days which can get among the selected ones: days with more than
+    2 * MAX_CHANGE met pairs above the selected-th least day stay above it after any swap.
+    """
+
+    def __init__(self, bits, days, roster, selected):
+        """
+        :param bits: bitset of met pairs, see MeetingTracker
+        :param days: array of shape (days, blocks, 3) of the schedule
+        :param roster: array of participants of points, index 0 is unused
+        :param selected: number of days the event takes
+        """
+        self.bits, self.days, self.roster, self.selected = bits, days, roster, selected
+        self.order = days.shape[1] * 3
+        self.day_numbers = np.arange(len(days))[:, np.newaxis]
+
+        # the other two points of the block of each point on each day
+        self.partners = np.zeros((self.order + 1, len(days), 2), dtype=np.int32)
+        for i, others in ((0, [1, 2]), (1, [0, 2]), (2, [0, 1])):
+            self.partners[days[:, :, i], self.day_numbers] = days[:, :, others]
+
+    def score(self, per_day):
+        """
+        :param per_day: array of met pairs per day, or of shape (candidates, days)
+        :return: sum of the smallest numbers of met pairs of selected days
+        """
+        if self.selected >= per_day.shape[-1]:
+            return per_day.sum(axis=-1)
+        return np.partition(per_day, self.selected - 1, axis=-1)[..., :self.selected].sum(axis=-1)
+
+    def partners_met(self, labels, points, day_numbers):
+        """
+        :param labels: array of participants of points
+        :param points: array of points
+        :param day_numbers: array of days broadcastable against points
+        :return: array of numbers (0 .. 2) of partners of points which their participants already met
+        """
+        partners = labels[self.partners[points, day_numbers]]
+        return met_bits(self.bits, pair_offsets(labels[points][..., np.newaxis], partners)).sum(axis=-1, dtype=np.int8)
+
+    def swap_deltas(self, labels, met, a, b, window):
+        """
+        :param labels: array of participants of points
+        :param met: array of shape (points, days) of numbers of already met partners, see partners_met
+        :param a: array of points
+        :param b: array of points to swap with a
+        :param window: array of days
+        :return: array of shape (len(a), len(window)) of changes of met pairs per day
+        """
+        a, b = a[:, np.newaxis], b[:, np.newaxis]
+        pa, pb = self.partners[a, window], self.partners[b, window]
+        la, lb = labels[a][..., np.newaxis], labels[b][..., np.newaxis]
+        # partner swapped along (a and b in the same block)
+        partner_a = np.where(pa == b[..., np.newaxis], la, labels[pa])
+        partner_b = np.where(pb == a[..., np.newaxis], lb, labels[pb])
+        new = met_bits(self.bits, pair_offsets(lb, partner_a)) + met_bits(self.bits, pair_offsets(la, partner_b))
+        return new.sum(axis=2, dtype=np.int64) - met[a, window] - met[b, window]
+
+    def run(self, seed, iterations):
+        """
+        Climb from random permutation.
+        :return: tuple (score, permutation of points 1 .. order)
+        """
+        rng = np.random.default_rng(seed)
+        permutation = np.zeros(self.order + 1, dtype=np.int64)
+        permutation[1:] = rng.permutation(self.order) + 1
+        labels = self.roster[permutation]
+        triples = labels[self.days]
+        ab, ac, bc = (met_bits(self.bits, pair_offsets(triples[..., i], triples[..., j])).astype(np.int8)
+                      for i, j in ((0, 1), (0, 2), (1, 2)))
+        met = np.zeros((self.order + 1, len(self.days)), dtype=np.int8)
+        for i, pair_bits in ((0, ab + ac), (1, ab + bc), (2, ac + bc)):
+            met[self.days[:, :, i], self.day_numbers] = pair_bits
+        per_day = (ab + ac + bc).sum(axis=1, dtype=np.int64)
+        score = self.score(per_day)
+
+        # whole schedule meets all pairs, any permutation is as good as the others
+        if self.selected < len(self.days):
+            all_days = np.arange(len(self.days))
+            window = None
+            for _ in range(iterations):
+                if score == 0:
+                    break
+                if window is None:
+                    least = np.partition(per_day, self.selected - 1)[self.selected - 1]
+                    window = np.flatnonzero(per_day <= least + 2 * MAX_CHANGE)
+                a, b = rng.integers(1, self.order + 1, (2, BATCH))
+                scores = self.score(per_day[window] + self.swap_deltas(labels, met, a, b, window))
+                k = int(np.argmin(scores))
+                if scores[k] <= score:
+                    x, y = a[k], b[k]
+                    per_day = per_day + self.swap_deltas(labels, met, a[k:k + 1], b[k:k + 1], all_days)[0]
+                    score, window = scores[k], None
+                    permutation[x], permutation[y] = permutation[y], permutation[x]
+                    labels[x], labels[y] = labels[y], labels[x]
+                    # swapped points and their partners on each day
+                    touched = np.concatenate((np.broadcast_to([x, y], (len(self.days), 2)),
+                                              self.partners[x], self.partners[y]), axis=1)
+                    met[touched, self.day_numbers] = self.partners_met(labels, touched, self.day_numbers)
+        return int(score), permutation[1:]
+
+
+def init_optimizer(bits, days, roster, selected):
+    global optimizer
+    optimizer = Optimizer(bits, days, roster, selected)
+
+
+def optimize_restart(seed, iterations):
+    return optimizer.run(seed, iterations)
+
+
+def optimize(tracker, solution, roster=None, days=None, restarts=8, iterations=500, processes=None, seed=None):
+    """
+    Find relabeling of the next schedule with the least pairs of participants who already met.
+    :param tracker: MeetingTracker of previous events
+    :param solution: KTSSolution of the next event
+    :param roster: participants of points, see MeetingTracker.labels
+    :param days: number of days the event takes, None for all
+    :param restarts: number of independent climbs from random permutations
+    :param iterations: number of steps of each climb
+    :param processes: run restarts in given number of worker processes
+    :param seed: seed of random permutations
+    :return: tuple (permutation, days, overlap): point x is relabeled to permutation[x - 1]
+        (see relabel.relabel), list of the chosen days counted from zero, least first,
+        and number of already met pairs in them
+    """
+    roster = tracker.labels(solution.order, roster)
+    array_days = solution.array()
+    selected = solution.num_days if days is None else days
+    if not 0 < selected <= solution.num_days:
+        raise ValueError('Event must take 1 .. %s days' % solution.num_days)
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+
+    if processes is not None and processes > 1:
+        with ProcessPoolExecutor(processes, initializer=init_optimizer,
+                                 initargs=(tracker.bits, array_days, roster, selected)) as executor:
+            results = list(executor.map(optimize_restart, seeds, [iterations] * restarts))
+    else:
+        climber = Optimizer(tracker.bits, array_days, roster, selected)
+        results = [climber.run(restart_seed, iterations) for restart_seed in seeds]
+
+    overlap, permutation = min(results, key=lambda result: result[0])
+    labels = np.zeros(solution.order + 1, dtype=np.int64)
+    labels[1:] = roster[permutation]
+    per_day = day_overlaps(tracker.bits, labels, array_days)
+    chosen = np.argsort(per_day, kind='stable')[:selected]
+    return permutation, chosen.tolist(), overlap
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Variants of KTS of one order: constructions 1.1 and 1.2 work with any primitive element alpha
+of Galois Field (m follows from alpha), each choice gives KTS, not necessarily isomorphic to the others.
+Variants are told apart by cheap invariant fingerprint, counts of Pasch configurations (four blocks
+on six points, each point in two of them) per block and per point. Different fingerprints prove
+that KTS are not isomorphic, equal fingerprints are treated as duplicates.
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from kts import KTS
+from pairindex import pair_offsets, pair_rows
+from verify import verify
+
+
+def third_points(solution):
+    """
+    :param solution: KTSSolution
+    :return: array of the third point of block containing each pair of points (int16 for order below 2^15),
+        indexed by pairindex.pair_offsets; one more slot keeps pair_offsets(x, x) of every point in range
+    """
+    order = solution.order
+    triples = solution.array().reshape(-1, 3)
+    third = np.zeros(order * (order - 1) // 2 + 1, dtype=np.int16 if order < 1 << 15 else np.int32)
+    for i, j, k in ((0, 1, 2), (0, 2, 1), (1, 2, 0)):
+        third[pair_offsets(triples[:, i], triples[:, j])] = triples[:, k]
+    return third
+
+
+def pasch_counts(solution):
+    """
+    Count Pasch configurations through each block and each point. Two blocks {x, a, b} and {x, c, d}
+    are in Pasch configuration iff third(a, c) = third(b, d) or third(a, d) = third(b, c).
+    :param solution: KTSSolution
+    :return: tuple (array of counts per block in order of solution, array of counts per point counted from one)
+    """
+    order = solution.order
+    triples = solution.array().reshape(-1, 3)
+    third = third_points(solution)
+    rows = pair_rows(order, np.int32 if order * (order - 1) // 2 < 1 << 31 else np.int64)
+
+    def slots(x, y):
+        return rows[np.maximum(x, y)] + np.minimum(x, y)
+
+    # blocks through each point, as (block, the other two points), grouped by point
+    points = triples.T.ravel()
+    others = np.concatenate([triples[:, [1, 2]], triples[:, [0, 2]], triples[:, [0, 1]]])
+    blocks = np.tile(np.arange(len(triples)), 3)
+    grouped = np.argsort(points, kind='stable').reshape(order, -1)
+
+    per_block = np.zeros(len(triples), dtype=np.int64)
+    per_point = np.zeros(order + 1, dtype=np.int64)
+    for x in range(order):
+        a, b = others[grouped[x], 0], others[grouped[x], 1]
+        # third(b, a) is transpose of third(a, b); diagonal pairs a point with itself, its lookups
+        # are meaningless and it is cleared
+        crossed = third[slots(a[:, None], b)]
+        matches = ((third[slots(a[:, None], a)] == third[slots(b[:, None], b)]).astype(np.int64)
+                   + (crossed == crossed.T))
+        np.fill_diagonal(matches, 0)
+        per_block[blocks[grouped[x]]] += matches.sum(axis=1)
+        per_point[x + 1] = matches.sum() // 2
+
+    # each Pasch configuration is found at its 3 points of every block
+    return per_block // 3, per_point[1:]
+
+
+def fingerprint(solution):
+    """
+    :param solution: KTSSolution
+    :return: tuple (hexadecimal digest of histograms of Pasch counts per block and per point,
+        total number of Pasch configurations)
+    """
+    per_block, per_point = pasch_counts(solution)
+    histograms = [np.unique(counts, return_counts=True) for counts in (per_block, per_point)]
+    digest = hashlib.sha1(repr((solution.order, [(values.tolist(), counts.tolist())
+                                                  for values, counts in histograms])).encode('ascii'))
+    return digest.hexdigest()[:16], int(per_point.sum() // 6)
+
+
+def solve_variant(order, alpha):
+    """
+    Worker solving, verifying and fingerprinting one variant.
+    :return: dictionary with order, alpha, m, valid, fingerprint, number of Pasch configurations
+        (pasch) and error of verification
+    """
+    kts = KTS(order, alpha=alpha)
+    variant = {'order': order, 'alpha': alpha, 'm': kts.field.m, 'valid': True,
+               'fingerprint': None, 'pasch': None, 'error': None}
+    solution = kts.solve(vectorized=True)
+    try:
+        verify(solution)
+    except AssertionError as e:
+        variant['valid'], variant['error'] = False, str(e)
+        return variant
+    variant['fingerprint'], variant['pasch'] = fingerprint(solution)
+    return variant
+
+
+def variants(order, processes=None, unique=True):
+    """
+    Enumerate variants of KTS of given order, one for each primitive element.
+    :param order: order of KTS
+    :param processes: solve variants by given number of worker processes
+    :param unique: skip valid variants whose fingerprint was already yielded
+    :return: iterator of dictionaries (see solve_variant), in order of completion
+    """
+    alphas = KTS(order).field.primitive_elements()
+    seen = set()
+
+    if processes is not None and processes > 1:
+        executor = ProcessPoolExecutor(processes)
+        results = (future.result() for future in
+                   as_completed([executor.submit(solve_variant, order, alpha) for alpha in alphas]))
+    else:
+        executor = None
+        results = (solve_variant(order, alpha) for alpha in alphas)
+
+    try:
+        for variant in results:
+            if unique and variant['valid']:
+                if variant['fingerprint'] in seen:
+                    continue
+                seen.add(variant['fingerprint'])
+            yield variant
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
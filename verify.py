@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized verification of KTS solution: every day is a parallel class (resolvability)
+and every pair of points is in exactly one triple (pair balance).
+Failed check raises AssertionError describing the first offending day or pair.
+Without NumPy days are checked one by one in pure Python, see check_triples.
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+try:
+    import numpy as np
+    from pairindex import POPCOUNT, met_bits, offset_pair, pair_offsets, pair_rows
+except ImportError:
+    np = None
+
+# number of points checked at once, bounds memory of temporary arrays
+CHUNK_POINTS = 1 << 22
+
+
+def check_days(days, first_day=0):
+    """
+    Test that each day contains every point exactly once.
+    :param days: array of shape (days, blocks, 3)
+    :param first_day: number of the first day of the array counted from zero
+    """
+    order = days.shape[1] * 3
+    expected = np.arange(1, order + 1)
+    step = max(1, CHUNK_POINTS // order)
+
+    for start in range(0, len(days), step):
+        rows = np.sort(days[start:start + step].reshape(-1, order), axis=1)
+        bad = np.flatnonzero((rows != expected).any(axis=1))
+        if len(bad):
+            row = rows[bad[0]]
+            missing = np.setdiff1d(expected, row)
+            assert False, 'Day %s is not a parallel class, there are missing %s / %s values (e.g. %s)' % (
+                first_day + start + bad[0] + 1, len(missing), order, missing[0])
+
+
+def chunk_offsets(days, dtype):
+    """
+    Offsets of pairs of triples (see pairindex.pair_offsets) by chunks of days.
+    :param days: array of shape (days, blocks, 3)
+    :param dtype: integer type of offsets, np.uint32 is enough for less than 2^32 pairs
+    :return: iterator of (the first day of chunk counted from zero, array of offsets of shape (3, triples))
+    """
+    order = days.shape[1] * 3
+    rows = pair_rows(order, dtype)
+    step = max(1, CHUNK_POINTS // order)
+    for start in range(0, len(days), step):
+        triples = days[start:start + step].reshape(-1, 3)
+        offsets = np.empty((3, len(triples)), dtype=dtype)
+        for k, (i, j) in enumerate(((0, 1), (0, 2), (1, 2))):
+            np.add(rows[np.maximum(triples[:, i], triples[:, j])], np.minimum(triples[:, i], triples[:, j]),
+                   out=offsets[k], dtype=dtype, casting='unsafe')
+        yield start, offsets
+
+
+def set_bits(seen, offsets):
+    """
+    Set bits of given pairs in bitset.
+    """
+    np.bitwise_or.at(seen, offsets >> 3, np.left_shift(1, (offsets & 7).astype(np.uint8), dtype=np.uint8))
+
+
+def check_pairs(days, first_day=0, seen=None):
+    """
+    Test that no pair of points is in more than one triple.
+    Bits of all pairs are set first and counted once: repeated pair sets its bit again,
+    so that fewer bits are set than there are pairs, only then the first repeated pair is located.
+    :param days: array of shape (days, blocks, 3)
+    :param first_day: number of the first day of the array counted from zero
+    :param seen: bitset of already seen pairs (see pairindex.met_bits), updated in place
+    :return: bitset of seen pairs, uint8 array of order * (order - 1) / 2 bits
+    """
+    order = days.shape[1] * 3
+    dtype = np.uint32 if order * (order - 1) // 2 < 1 << 32 else np.int64
+    if seen is None:
+        seen = np.zeros((order * (order - 1) // 2 + 7) // 8, dtype=np.uint8)
+        initial, count = None, 0
+    else:
+        initial, count = seen.copy(), int(POPCOUNT[seen].sum(dtype=np.int64))
+
+    for _, offsets in chunk_offsets(days, dtype):
+        # sorted offsets update the bitset from start to end, with better locality than in order of triples
+        set_bits(seen, np.sort(offsets, axis=None))
+        count += offsets.size
+
+    if int(POPCOUNT[seen].sum(dtype=np.int64)) != count:
+        seen = np.zeros_like(seen) if initial is None else initial
+        for start, offsets in chunk_offsets(days, dtype):
+            # pairs seen before, then pairs repeated within the chunk, in order of triples
+            offsets = offsets.T.ravel()
+            repeated = met_bits(seen, offsets).astype(bool)
+            order_of_offsets = np.argsort(offsets, kind='stable')
+            repeated[order_of_offsets[1:]] |= offsets[order_of_offsets[1:]] == offsets[order_of_offsets[:-1]]
+            bad = np.flatnonzero(repeated)
+            assert not len(bad), 'Pair %s is in more than one triple, again on day %s' % (
+                offset_pair(int(offsets[bad[0]])), first_day + start + bad[0] // 3 // days.shape[1] + 1)
+            set_bits(seen, offsets)
+    return seen
+
+
+def check_coverage(seen, order):
+    """
+    Test that every pair of points was seen.
+    :param seen: bitset of seen pairs, see check_pairs
+    :param order: order of KTS
+    """
+    pairs = order * (order - 1) // 2
+    # all bytes are full except the last one, which has pairs % 8 bits (or 8)
+    full = pairs // 8
+    if (seen[:full] == 0xFF).all() and (pairs % 8 == 0 or seen[full] == (1 << pairs % 8) - 1):
+        return
+    missing = np.flatnonzero(np.unpackbits(seen, count=pairs, bitorder='little') == 0)
+    assert False, 'There are %s pairs in no triple, e.g. %s' % (len(missing), offset_pair(int(missing[0])))
+
+
+def verify_days(days, first_day):
+    """
+    Worker of parallel verification.
+    :return: bitset of pairs seen in given days, see check_pairs
+    """
+    check_days(days, first_day)
+    return check_pairs(days, first_day)
+
+
+def check_triples(order, days, complete=True):
+    """
+    Test days given as lists of triples without NumPy, seen pairs are marked in bitset
+    of order * (order - 1) / 2 bits (see pairindex.pair_offsets).
+    :param order: order of KTS
+    :param days: iterable of (day number counted from one, list of triples)
+    :param complete: test also that there are all days and every pair is in some triple
+    """
+    expected = list(range(1, order + 1))
+    seen = bytearray((order * (order - 1) // 2 + 7) // 8)
+    num_days = 0
+
+    for day, blocks in days:
+        num_days += 1
+        points = sorted(chain.from_iterable(blocks))
+        if points != expected:
+            missing = sorted(set(expected).difference(points)) or [None]
+            assert False, 'Day %s is not a parallel class, there are missing %s / %s values (e.g. %s)' % (
+                day, len(set(expected).difference(points)), order, missing[0])
+        for block in blocks:
+            for x, y in ((block[0], block[1]), (block[0], block[2]), (block[1], block[2])):
+                low, high = (x, y) if x < y else (y, x)
+                offset = (high - 1) * (high - 2) // 2 + low - 1
+                bit = 1 << (offset & 7)
+                assert not seen[offset >> 3] & bit, 'Pair %s is in more than one triple, again on day %s' % (
+                    (low, high), day)
+                seen[offset >> 3] |= bit
+
+    if complete:
+        assert num_days == (order - 1) // 2, 'There are %s days instead of %s' % (num_days, (order - 1) // 2)
+        covered = bin(int.from_bytes(seen, 'little')).count('1')
+        assert covered == order * (order - 1) // 2, \
+            'There are %s pairs in no triple' % (order * (order - 1) // 2 - covered)
+
+
+def verify(solution, sample=None, processes=None, seed=None):
+    """
+    Verify KTS solution, by check_triples when NumPy is not available (processes are not used then).
+    :param solution: KTSSolution
+    :param sample: check only given number of randomly chosen days, i.e. their resolvability
+        and that no pair repeats among them (for huge orders)
+    :param processes: split days between given number of worker processes
+    :param seed: seed of random choice of days
+    """
+    order = solution.order
+    assert solution.num_days == (order - 1) // 2, \
+        'There are %s days instead of %s' % (solution.num_days, (order - 1) // 2)
+
+    if np is None:
+        if sample is None:
+            check_triples(order, solution.items())
+        else:
+            chosen = sorted(random.Random(seed).sample(range(solution.num_days), min(sample, solution.num_days)))
+            check_triples(order, ((d + 1, solution.day(d)) for d in chosen), complete=False)
+        return
+
+    days = solution.array()
+    if sample is not None:
+        chosen = np.sort(np.random.default_rng(seed).choice(len(days), min(sample, len(days)), replace=False))
+        for d in chosen:
+            check_days(days[d:d + 1], d)
+        triples = days[chosen].reshape(-1, 3)
+        offsets, counts = np.unique(np.concatenate(
+            [pair_offsets(triples[:, i], triples[:, j]) for i, j in ((0, 1), (0, 2), (1, 2))]), return_counts=True)
+        repeated = np.flatnonzero(counts > 1)
+        assert not len(repeated), 'Pair %s is in more than one triple' % (offset_pair(int(offsets[repeated[0]])),)
+
+    elif processes is not None and processes > 1:
+        bounds = np.linspace(0, len(days), processes + 1).astype(int)
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(verify_days, np.array(days[start:stop]), start)
+                       for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop]
+            seen = np.zeros((order * (order - 1) // 2 + 7) // 8, dtype=np.uint8)
+            for future in futures:
+                bits = future.result()
+                if (seen & bits).any():
+                    common = np.flatnonzero(np.unpackbits(seen & bits, bitorder='little'))
+                    assert False, 'Pair %s is in more than one triple' % (offset_pair(int(common[0])),)
+                seen |= bits
+        check_coverage(seen, order)
+
+    else:
+        check_days(days)
+        check_coverage(check_pairs(days), order)
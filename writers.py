@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Buffered writers of KTS schedules. Whole chunks of days are formatted into one buffer,
+which is written by single call, instead of printing triple by triple.
+"""
+
+import json
+from array import array
+from itertools import chain, islice
+
+from solution import KTSSolution
+
+# number of points formatted into one buffer
+CHUNK_POINTS = 1 << 16
+
+
+class Writer:
+    """
+    Base writer of days, given as KTSSolution or iterable of (day number counted from one, list of triples),
+    e.g. KTSSolution.items() or enumerate(KTS.iter_days(), 1).
+    """
+
+    binary = False
+
+    def __init__(self, stream):
+        """
+        :param stream: text stream (binary stream for binary writers)
+        """
+        self.stream = stream
+
+    def write(self, kts, days, heading=False):
+        """
+        :param kts: KTS instance
+        :param days: KTSSolution or iterable of (day number, list of triples)
+        :param heading: write description of KTS first
+        """
+        if heading:
+            self.stream.write(self.format_heading(kts))
+        format_day = self.format_day
+        if isinstance(days, KTSSolution):
+            # flat points of each day, not converted to triples
+            solution, format_day = days, self.format_points
+            days = ((d + 1, solution.points[d * solution.order:(d + 1) * solution.order])
+                    for d in range(solution.num_days))
+
+        days = iter(days)
+        chunk_days = max(1, CHUNK_POINTS // kts.order)
+        while True:
+            chunk = [format_day(day, blocks) for day, blocks in islice(days, chunk_days)]
+            if not chunk:
+                break
+            self.stream.write((b'' if self.binary else '').join(chunk))
+
+    def format_heading(self, kts):
+        return ''
+
+    def format_day(self, day, blocks):
+        raise NotImplementedError
+
+    def format_points(self, day, points):
+        """
+        :param day: day number counted from one
+        :param points: flat sequence of points of the day (three per block)
+        """
+        points = points.tolist()
+        return self.format_day(day, list(zip(points[0::3], points[1::3], points[2::3])))
+
+
+class TextWriter(Writer):
+    """
+    Text table, one day per line (the layout of KTS.print_solution).
+    """
+
+    def format_heading(self, kts):
+        return '%s\n' % kts
+
+    def format_day(self, day, blocks):
+        return ('Day %2s: ' + '%-12s  ' * len(blocks) + '\n') % (day, *['(%d, %d, %d)' % block_triple
+                                                                  for block_triple in blocks])
+
+    def format_points(self, day, points):
+        # format all triples of the day by one operation, then pad them
+        blocks = len(points) // 3
+        triples = (('(%d, %d, %d)\n' * blocks) % tuple(points)).split('\n')
+        triples.pop()
+        return ('Day %2s: ' + '%-12s  ' * blocks + '\n') % (day, *triples)
+
+
+class CsvWriter(Writer):
+    """
+    CSV, one triple per row: day, block, x, y, z (day and block counted from one).
+    """
+
+    def format_heading(self, kts):
+        return 'day,block,x,y,z\r\n'
+
+    def format_day(self, day, blocks):
+        return ''.join(['%s,%s,%s,%s,%s\r\n' % (day, block, x, y, z) for block, (x, y, z) in enumerate(blocks, 1)])
+
+
+class JsonlWriter(Writer):
+    """
+    JSON Lines, one object per day: {"day": day counted from one, "triples": [[x, y, z], ...]}.
+    Heading is an object describing KTS.
+    """
+
+    def format_heading(self, kts):
+        return json.dumps({'order': kts.order, 'method': kts.method_name, 'q': kts.q, 'days': kts.num_days}) + '\n'
+
+    def format_day(self, day, blocks):
+        return '{"day": %s, "triples": %s}\n' % (day, json.dumps(blocks, separators=(',', ':')))
+
+
+class BinaryWriter(Writer):
+    """
+    Packed uint32 triples in native byte order, day by day (see KTSSolution.array), without heading.
+    """
+
+    binary = True
+
+    def write(self, kts, days, heading=False):
+        if isinstance(days, KTSSolution) and days.points.format == 'I':
+            points = days.points.cast('B')
+            chunk_bytes = CHUNK_POINTS * 4
+            for start in range(0, len(points), chunk_bytes):
+                self.stream.write(points[start:start + chunk_bytes])
+        else:
+            super().write(kts, days)
+
+    def format_day(self, day, blocks):
+        return array('I', chain.from_iterable(blocks)).tobytes()
+
+
+WRITERS = {
+    'text': TextWriter,
+    'csv': CsvWriter,
+    'jsonl': JsonlWriter,
+    'bin': BinaryWriter,
+}